@@ -0,0 +1,409 @@
+"""
+Punto de entrada de línea de comandos para el proceso ETL de valorización de energía.
+
+Cada subcomando importa únicamente los módulos que necesita (Selenium, Pandas, SQLAlchemy),
+de modo que las consultas ligeras como 'next-period' arrancan rápido y los trabajadores que
+solo cargan datos no requieren un navegador instalado.
+
+Ejemplos:
+    python cli.py next-period
+    python cli.py download --period 2024-01
+    python cli.py extract --file ResumenCuadros.xlsx --period 2024-01 --output datos.csv
+    python cli.py load --file ResumenCuadros.xlsx --period 2024-01
+    python cli.py backfill --from 2018-01 --to 2024-12
+    python cli.py enqueue --from 2018-01 --to 2024-12
+    python cli.py worker
+    python cli.py daemon --interval 300 --max-interval 3600
+    python cli.py prune --max-files 120
+"""
+import argparse
+import os
+import sys
+
+from periods import parse_period, format_period
+
+
+def _period_argument(value):
+    """
+    Convierte un argumento 'AAAA-MM' en una tupla (año, mes) para argparse.
+
+    Raises:
+        argparse.ArgumentTypeError: Si el periodo no es válido, con el mensaje de `parse_period`.
+    """
+    try:
+        return parse_period(value)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(str(ex))
+
+
+def _period_range(args):
+    """
+    Retorna el rango de periodos (--from, --to), validando que el inicial no sea posterior al final.
+    """
+    if args.start > args.end:
+        raise SystemExit(
+            f"El periodo inicial {format_period(*args.start)} es posterior al final {format_period(*args.end)}"
+        )
+    return args.start, args.end
+
+
+def _load_env_file(env_file):
+    """
+    Carga las variables de un archivo .env sin sobrescribir las ya definidas en el entorno.
+
+    Args:
+        env_file (str): Ruta del archivo .env. Si es None o vacío no se realiza ninguna acción.
+    """
+    if not env_file:
+        return
+    from dotenv import load_dotenv
+    load_dotenv(env_file, override=False)
+
+
+def _chunk_size(args):
+    """
+    Retorna el tamaño de bloque indicado por argumento o por la variable 'CHUNK_SIZE'.
+
+    Un valor nulo o cero indica que la hoja se procesa completa en memoria.
+    """
+    chunk_size = args.chunk_size
+    if chunk_size is None:
+        try:
+            chunk_size = int(os.getenv('CHUNK_SIZE', '0'))
+        except ValueError:
+            raise SystemExit("La variable CHUNK_SIZE debe ser un número entero")
+    if chunk_size < 0:
+        raise SystemExit("El tamaño de bloque (--chunk-size / CHUNK_SIZE) no puede ser negativo")
+    return chunk_size or None
+
+
+def _downloads_path(args):
+    """
+    Retorna el directorio de descargas indicado por argumento o por la variable 'DOWNLOADS_PATH'.
+    """
+    downloads_path = args.downloads_path or os.getenv('DOWNLOADS_PATH')
+    if not downloads_path:
+        raise SystemExit("Debe indicar --downloads-path o definir la variable DOWNLOADS_PATH")
+    return downloads_path
+
+
+# --------------------- Subcomandos --------------------- #
+def cmd_next_period(args):
+    """
+    Muestra el siguiente periodo a recuperar según la base de datos.
+    """
+    from load import DataLoader
+
+    year, month = DataLoader(args.connection_string).get_date_to_retrieve()
+    print(format_period(year, month))
+
+
+def cmd_download(args):
+    """
+    Descarga el archivo Excel del periodo indicado y muestra su ruta en el archivo histórico.
+    """
+    from download import download_period
+    from download_dir import DownloadDirectoryManager
+
+    download_dir = DownloadDirectoryManager.from_env(_downloads_path(args))
+    year, month = args.period
+    print(download_period(download_dir, year, month))
+
+
+def cmd_extract(args):
+    """
+    Extrae y transforma un archivo Excel y escribe el resultado en formato CSV.
+    """
+    from extract import DataExtractor
+    from transform import DataTransformer
+
+    year, month = args.period
+    extractor = DataExtractor()
+    chunk_size = args.chunk_size
+    if chunk_size:
+        chunks = extractor.iter_data_chunks(args.file, chunk_size)
+    else:
+        chunks = [extractor.extract_data_from_sheet(args.file)]
+
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        # Se escribe la cabecera solo con el primer bloque
+        for i, chunk in enumerate(DataTransformer.transform_chunks(chunks, year, month)):
+            chunk.to_csv(output, index=False, header=(i == 0))
+    finally:
+        if args.output:
+            output.close()
+
+
+def cmd_load(args):
+    """
+    Extrae, transforma y carga en la base de datos un archivo Excel ya descargado.
+    """
+    from load import DataLoader
+    from pipeline import process_file
+
+    year, month = args.period
+    loader = DataLoader(args.connection_string)
+    total_rows = process_file(args.file, year, month, loader, args.chunk_size)
+    print(f"{format_period(year, month)}: {total_rows} filas cargadas")
+
+
+def cmd_backfill(args):
+    """
+    Ejecuta el proceso ETL completo para un rango de periodos.
+    """
+    start, end = _period_range(args)
+    from etl_job import run_job
+
+    run_job(
+        start, end, _downloads_path(args),
+        pause=args.pause, connection_string=args.connection_string,
+        chunk_size=args.chunk_size
+    )
+
+
+def _work_queue(args):
+    """
+    Crea la cola de trabajo sobre 'QUEUE_DB_URL' o, si no está definida, sobre la base de datos
+    de destino.
+    """
+    from db import DatabaseManager
+    from load import DataLoader
+    from work_queue import PeriodWorkQueue
+
+    queue_url = args.queue_url or os.getenv('QUEUE_DB_URL')
+    if queue_url:
+        db = DatabaseManager(queue_url)
+    else:
+        db = DataLoader(args.connection_string).db
+    return PeriodWorkQueue(
+        db.engine,
+        schema=os.getenv('QUEUE_SCHEMA') or None,
+        max_attempts=args.max_attempts,
+    )
+
+
+def cmd_enqueue(args):
+    """
+    Agrega a la cola de trabajo los periodos de un rango.
+    """
+    from periods import iter_periods
+
+    start, end = _period_range(args)
+    added = _work_queue(args).enqueue(iter_periods(start, end))
+    print(f"{added} periodos agregados a la cola")
+
+
+def cmd_queue_status(args):
+    """
+    Muestra la cantidad de periodos de la cola en cada estado.
+    """
+    for estado, cantidad in sorted(_work_queue(args).status_counts().items()):
+        print(f"{estado}: {cantidad}")
+
+
+def cmd_worker(args):
+    """
+    Ejecuta un trabajador que procesa periodos de la cola de trabajo.
+    """
+    import socket
+    from etl_job import run_worker
+
+    worker_id = args.worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    run_worker(
+        _work_queue(args), worker_id, _downloads_path(args),
+        connection_string=args.connection_string,
+        chunk_size=args.chunk_size,
+        lease_seconds=args.lease_seconds,
+        heartbeat_seconds=args.heartbeat_seconds,
+        poll_seconds=args.poll_seconds,
+        exit_when_empty=not args.wait,
+    )
+
+
+def cmd_daemon(args):
+    """
+    Ejecuta el proceso de larga duración que detecta y carga nuevas publicaciones.
+    """
+    from daemon import PublicationDaemon
+    from download_dir import DownloadDirectoryManager
+    from load import DataLoader
+
+    daemon = PublicationDaemon(
+        DownloadDirectoryManager.from_env(_downloads_path(args)),
+        # pool_pre_ping descarta conexiones del pool cerradas por el servidor durante la espera
+        DataLoader(args.connection_string, pool_pre_ping=True),
+        interval_seconds=args.interval,
+        max_interval_seconds=args.max_interval,
+        backoff=args.backoff,
+        watch_months=args.watch_months,
+        chunk_size=args.chunk_size,
+    )
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+def cmd_prune(args):
+    """
+    Aplica la política de retención al archivo histórico de descargas.
+    """
+    from download_dir import DownloadDirectoryManager
+
+    download_dir = DownloadDirectoryManager.from_env(_downloads_path(args))
+    removed = download_dir.prune(args.max_files, args.max_age_days, args.max_bytes)
+    removed += download_dir.purge_stale_staging(args.staging_max_age_hours)
+    for path in removed:
+        print(path)
+
+
+# --------------------- Construcción del parser --------------------- #
+def build_parser():
+    """
+    Construye el parser de argumentos con todos los subcomandos disponibles.
+
+    Returns:
+        argparse.ArgumentParser: Parser configurado.
+    """
+    parser = argparse.ArgumentParser(
+        prog='etl',
+        description='Proceso ETL de valorización de energía (COES).'
+    )
+    parser.add_argument(
+        '--env-file', default=os.getenv('ETL_ENV_FILE'),
+        help='Archivo .env con la configuración (por defecto, la variable ETL_ENV_FILE).'
+    )
+
+    # Opciones compartidas entre subcomandos
+    db_options = argparse.ArgumentParser(add_help=False)
+    db_options.add_argument(
+        '--connection-string', default=None,
+        help='Cadena de conexión SQLAlchemy (por defecto, DB_CONNECTION_STRING o las variables SQL_DRIVE, '
+             'SERVER_NAME, DB, ADMIN y PSWD).'
+    )
+    chunk_options = argparse.ArgumentParser(add_help=False)
+    chunk_options.add_argument(
+        '--chunk-size', type=int, default=None,
+        help='Filas por bloque para procesar la hoja por bloques (por defecto, la variable CHUNK_SIZE; '
+             '0 procesa la hoja completa).'
+    )
+    downloads_options = argparse.ArgumentParser(add_help=False)
+    downloads_options.add_argument(
+        '--downloads-path', default=None,
+        help='Directorio de descargas (por defecto, la variable DOWNLOADS_PATH).'
+    )
+    queue_options = argparse.ArgumentParser(add_help=False)
+    queue_options.add_argument(
+        '--queue-url', default=None,
+        help='Cadena de conexión SQLAlchemy de la cola, p. ej. sqlite:///cola.db '
+             '(por defecto, QUEUE_DB_URL o la base de datos de destino).'
+    )
+    queue_options.add_argument('--max-attempts', type=int, default=3, help='Intentos máximos por periodo.')
+    file_options = argparse.ArgumentParser(add_help=False)
+    file_options.add_argument('--file', required=True, help='Ruta del archivo Excel descargado.')
+    file_options.add_argument('--period', required=True, type=_period_argument, help='Periodo AAAA-MM.')
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sub = subparsers.add_parser(
+        'next-period', parents=[db_options], help='Muestra el siguiente periodo a recuperar.'
+    )
+    sub.set_defaults(func=cmd_next_period)
+
+    sub = subparsers.add_parser(
+        'download', parents=[downloads_options], help='Descarga el archivo Excel de un periodo.'
+    )
+    sub.add_argument('--period', required=True, type=_period_argument, help='Periodo AAAA-MM.')
+    sub.set_defaults(func=cmd_download)
+
+    sub = subparsers.add_parser(
+        'extract', parents=[file_options, chunk_options], help='Extrae y transforma un archivo Excel a CSV.'
+    )
+    sub.add_argument('--output', default=None, help='Archivo CSV de salida (por defecto, stdout).')
+    sub.set_defaults(func=cmd_extract)
+
+    sub = subparsers.add_parser(
+        'load', parents=[file_options, db_options, chunk_options], help='Carga un archivo Excel en la base de datos.'
+    )
+    sub.set_defaults(func=cmd_load)
+
+    sub = subparsers.add_parser(
+        'backfill', parents=[downloads_options, db_options, chunk_options], help='Ejecuta el ETL para un rango de periodos.'
+    )
+    sub.add_argument('--from', dest='start', required=True, type=_period_argument, help='Periodo inicial AAAA-MM.')
+    sub.add_argument('--to', dest='end', required=True, type=_period_argument, help='Periodo final AAAA-MM.')
+    sub.add_argument('--pause', type=float, default=3, help='Segundos de espera entre periodos.')
+    sub.set_defaults(func=cmd_backfill)
+
+    sub = subparsers.add_parser(
+        'enqueue', parents=[queue_options, db_options],
+        help='Agrega un rango de periodos a la cola de trabajo.'
+    )
+    sub.add_argument('--from', dest='start', required=True, type=_period_argument, help='Periodo inicial AAAA-MM.')
+    sub.add_argument('--to', dest='end', required=True, type=_period_argument, help='Periodo final AAAA-MM.')
+    sub.set_defaults(func=cmd_enqueue)
+
+    sub = subparsers.add_parser(
+        'queue-status', parents=[queue_options, db_options],
+        help='Muestra el estado de la cola de trabajo.'
+    )
+    sub.set_defaults(func=cmd_queue_status)
+
+    sub = subparsers.add_parser(
+        'worker', parents=[queue_options, downloads_options, db_options, chunk_options],
+        help='Procesa periodos de la cola de trabajo.'
+    )
+    sub.add_argument('--worker-id', default=None, help='Identificador del trabajador (por defecto, host:pid).')
+    sub.add_argument('--lease-seconds', type=float, default=900, help='Duración del lease de cada periodo.')
+    sub.add_argument('--heartbeat-seconds', type=float, default=60, help='Intervalo de renovación del lease.')
+    sub.add_argument('--poll-seconds', type=float, default=30, help='Espera cuando la cola está vacía (con --wait).')
+    sub.add_argument('--wait', action='store_true', help='Esperar nuevos periodos en lugar de terminar.')
+    sub.set_defaults(func=cmd_worker)
+
+    sub = subparsers.add_parser(
+        'daemon', parents=[downloads_options, db_options, chunk_options],
+        help='Consulta el portal periódicamente y carga las nuevas publicaciones.'
+    )
+    sub.add_argument('--interval', type=float, default=300, help='Intervalo inicial entre consultas (segundos).')
+    sub.add_argument('--max-interval', type=float, default=3600, help='Intervalo máximo entre consultas (segundos).')
+    sub.add_argument('--backoff', type=float, default=2, help='Factor de crecimiento del intervalo sin novedades.')
+    sub.add_argument('--watch-months', type=int, default=2,
+                     help='Periodos revisados, contando desde el siguiente a recuperar.')
+    sub.set_defaults(func=cmd_daemon)
+
+    sub = subparsers.add_parser(
+        'prune', parents=[downloads_options],
+        help='Elimina descargas archivadas según la política de retención.'
+    )
+    sub.add_argument('--max-files', type=int, default=None,
+                     help='Archivos a conservar (por defecto, RETENTION_MAX_FILES).')
+    sub.add_argument('--max-age-days', type=float, default=None,
+                     help='Antigüedad máxima en días (por defecto, RETENTION_MAX_AGE_DAYS).')
+    sub.add_argument('--max-bytes', type=int, default=None,
+                     help='Tamaño total máximo en bytes (por defecto, RETENTION_MAX_BYTES).')
+    sub.add_argument('--staging-max-age-hours', type=float, default=24,
+                     help='Antigüedad a partir de la cual se eliminan carpetas de staging abandonadas.')
+    sub.set_defaults(func=cmd_prune)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Punto de entrada principal de la línea de comandos.
+
+    Args:
+        argv (list, opcional): Argumentos a interpretar. Por defecto, los de sys.argv.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _load_env_file(args.env_file)
+    # El tamaño de bloque se valida antes de importar módulos pesados
+    if 'chunk_size' in args:
+        args.chunk_size = _chunk_size(args)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
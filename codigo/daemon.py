@@ -0,0 +1,154 @@
+import threading
+
+from download import DownloadManager, download_period
+from periods import format_period, shift_period
+from pipeline import process_file
+
+
+class PublicationDaemon:
+    """
+    Proceso de larga duración que detecta nuevas publicaciones en el portal y las carga.
+
+    A diferencia de `run_etl_job`, que abre un navegador nuevo en cada ejecución, el proceso
+    mantiene una única sesión de Chrome y un único pool de conexiones a la base de datos. En
+    cada consulta solo se revisa el listado de revisiones de los últimos meses (el siguiente
+    periodo a recuperar y los anteriores indicados por `watch_months`), y la descarga y carga
+    se ejecutan únicamente cuando aparece un archivo "ResumenCuadros" o una revisión que aún no
+    se cargó. Cada carga reemplaza las filas previas del periodo en la tabla de landing y
+    registra la revisión cargada dentro de una única transacción, por lo que una nueva revisión
+    sustituye a la anterior en lugar de duplicarla, y una carga fallida no queda registrada y se
+    reintenta en la siguiente consulta. La revisión cargada de cada periodo se lee de la base de
+    datos la primera vez que se revisa el periodo, de modo que sobrevive a reinicios. Si una
+    consulta no encuentra novedades, el intervalo de espera crece según `backoff` hasta
+    `max_interval_seconds`; al encontrar una publicación vuelve al intervalo inicial.
+    """
+
+    def __init__(self, download_dir, loader, interval_seconds=300, max_interval_seconds=3600,
+                 backoff=2, watch_months=2, chunk_size=None):
+        """
+        Args:
+            download_dir (DownloadDirectoryManager): Gestor del directorio de descargas.
+            loader (DataLoader): Cargador con la conexión (y el pool) a la base de datos.
+            interval_seconds (int/float): Intervalo inicial entre consultas.
+            max_interval_seconds (int/float): Intervalo máximo entre consultas.
+            backoff (float): Factor de crecimiento del intervalo cuando no hay novedades.
+            watch_months (int): Cantidad de periodos revisados, contando desde el siguiente a recuperar.
+            chunk_size (int, opcional): Número de filas por bloque para procesar cada hoja.
+        """
+        self.download_dir = download_dir
+        self.loader = loader
+        self.interval_seconds = interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.backoff = backoff
+        self.watch_months = watch_months
+        self.chunk_size = chunk_size
+
+        # Siguiente periodo a recuperar; se consulta a la base de datos solo al iniciar
+        self.next_period = None
+        # Última revisión cargada de cada periodo revisado {'AAAA-MM': revisión}, leída de la
+        # base de datos y actualizada tras cada carga exitosa
+        self.known_revisions = {}
+        self.browser = None
+        self._stop = threading.Event()
+
+    def _get_browser(self):
+        """
+        Retorna la sesión de navegador activa, iniciándola si es necesario.
+        """
+        if self.browser is None:
+            self.browser = DownloadManager(self.download_dir.staging_path)
+        return self.browser
+
+    def _close_browser(self):
+        """
+        Cierra la sesión de navegador activa, ignorando errores de una sesión ya caída.
+        """
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as ex:
+                print("Se produjo la excepción al cerrar el navegador:", ex)
+            self.browser = None
+
+    def _watched_periods(self):
+        """
+        Retorna los periodos revisados en cada consulta, del más antiguo al más reciente.
+        """
+        return [shift_period(self.next_period, -i) for i in reversed(range(self.watch_months))]
+
+    def poll(self):
+        """
+        Realiza una consulta al portal y carga las publicaciones nuevas encontradas.
+
+        Returns:
+            int: Número de periodos descargados y cargados.
+        """
+        browser = self._get_browser()
+        loaded = 0
+
+        for year, month in self._watched_periods():
+            period = format_period(year, month)
+            already_loaded = (year, month) < self.next_period
+            if period not in self.known_revisions:
+                self.known_revisions[period] = self.loader.get_loaded_revision(period)
+            known = self.known_revisions[period]
+
+            publication = browser.find_publication(year, month, after_revision=known)
+            if publication is None:
+                continue
+            revision, file_name = publication
+
+            # Un periodo cargado sin revisión registrada (por ejemplo, con `run_etl_job`) toma
+            # como referencia la primera publicación observada
+            if already_loaded and known is None:
+                print(f"{period}: revisión {revision} tomada como referencia")
+                self.known_revisions[period] = revision
+                continue
+
+            print(f"{period}: nueva publicación {file_name} (revisión {revision})")
+            file_path = download_period(self.download_dir, year, month, browser)
+            revision = browser.revision
+            total_rows = process_file(
+                file_path, year, month, self.loader, self.chunk_size, replace=True, revision=revision
+            )
+            print(f"{period}: {total_rows} filas cargadas")
+
+            # La base de datos ya registró la revisión junto con los datos
+            self.known_revisions[period] = revision
+            loaded += 1
+            if (year, month) == self.next_period:
+                self.next_period = shift_period(self.next_period, 1)
+
+        return loaded
+
+    def run(self):
+        """
+        Ejecuta consultas sucesivas hasta que se invoque `stop`.
+        """
+        self.next_period = self.loader.get_date_to_retrieve()
+        interval = self.interval_seconds
+        print(f"Siguiente periodo a recuperar: {format_period(*self.next_period)}")
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    loaded = self.poll()
+                except Exception as ex:
+                    # Ante un error se reinicia la sesión del navegador en la siguiente consulta
+                    print("Se produjo la excepción:", ex)
+                    self._close_browser()
+                    loaded = 0
+
+                if loaded:
+                    interval = self.interval_seconds
+                self._stop.wait(interval)
+                if not loaded:
+                    interval = min(interval * self.backoff, self.max_interval_seconds)
+        finally:
+            self._close_browser()
+
+    def stop(self):
+        """
+        Solicita la detención del proceso al finalizar la consulta en curso.
+        """
+        self._stop.set()
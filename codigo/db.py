@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 
 class DatabaseManager:
     """
@@ -7,14 +7,16 @@ class DatabaseManager:
     Permite ejecutar consultas SQL y almacenar datos desde un DataFrame de Pandas.
     """
 
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, **engine_options):
         """
         Inicializa la conexión a la base de datos usando la cadena de conexión.
 
         Args:
             connection_string (str): Cadena de conexión para la base de datos.
+            **engine_options: Opciones adicionales para `create_engine` (por ejemplo, del pool
+                de conexiones).
         """
-        self.engine = create_engine(connection_string)
+        self.engine = create_engine(connection_string, **engine_options)
 
     def get_single_value(self, sql_query: str):
         """
@@ -66,3 +68,47 @@ class DatabaseManager:
             schema='bronce',
             if_exists='append'
         )
+
+    def store_data_pandas_chunks(self, chunks, table_name: str, key_column: str = None, key_value=None,
+                                 before_commit=None):
+        """
+        Almacena una secuencia de DataFrames en la tabla especificada dentro de una única transacción.
+
+        Cada bloque se inserta a medida que se consume, por lo que solo un bloque permanece en
+        memoria a la vez. Si ocurre un error en cualquier bloque, se revierte la carga completa.
+        Si se indica `key_column`, antes de insertar se eliminan, en la misma transacción, las
+        filas existentes con `key_value` en esa columna, de modo que la carga reemplaza los
+        datos previos en lugar de duplicarlos. Si se indica `before_commit`, se invoca con la
+        conexión después de insertar todos los bloques, de modo que sus operaciones se
+        confirman o revierten junto con la carga.
+
+        Args:
+            chunks (iterable): Bloques (DataFrame) con los datos a almacenar.
+            table_name (str): Nombre de la tabla donde se almacenarán los datos.
+            key_column (str, opcional): Columna que identifica los datos a reemplazar.
+            key_value (opcional): Valor de `key_column` de los datos a reemplazar.
+            before_commit (callable, opcional): Función que recibe la conexión y se ejecuta
+                dentro de la misma transacción antes de confirmarla.
+
+        Returns:
+            int: Número total de filas insertadas.
+        """
+        total_rows = 0
+        with self.engine.begin() as connection:
+            if key_column is not None:
+                connection.execute(
+                    text(f'DELETE FROM bronce.{table_name} WHERE {key_column} = :key_value'),
+                    {'key_value': key_value}
+                )
+            for chunk in chunks:
+                chunk.to_sql(
+                    name=table_name,
+                    con=connection,
+                    index=False,
+                    schema='bronce',
+                    if_exists='append'
+                )
+                total_rows += len(chunk)
+            if before_commit is not None:
+                before_commit(connection)
+        return total_rows
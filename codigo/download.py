@@ -30,7 +30,12 @@ class DownloadManager():
             downloads_path (str): Ruta del directorio donde se guardarán los archivos descargados.
         """
         self.url = 'https://www.coes.org.pe/Portal/mercadomayorista/liquidaciones'
-        self.downloads_path = downloads_path
+        # Chrome requiere una ruta absoluta como directorio de descarga
+        self.downloads_path = os.path.abspath(downloads_path)
+        # Número de la revisión descargada (0 si se descargó desde la carpeta mensual)
+        self.revision = None
+        # Indica si el navegador ya recorrió el portal y debe volver a la página inicial
+        self._navigated = False
         # Genera un tiempo de espera aleatorio entre 2 y 5 segundos para simular la interacción humana
         self.time_wait = lambda: round(uniform(2, 5), 3)
 
@@ -139,7 +144,7 @@ class DownloadManager():
         }
         return meses[mes]
 
-    def _identify_monthname_button(self, mes):
+    def _identify_monthname_button(self, mes, min_similarity=0):
         """
         Identifica el botón correspondiente al mes requerido en la interfaz.
         
@@ -148,9 +153,12 @@ class DownloadManager():
         
         Args:
             mes (str): Número del mes (ejemplo: '01').
+            min_similarity (float): Similitud mínima exigida. Permite detectar que el mes
+                todavía no fue publicado.
             
         Returns:
-            str: Nombre del mes tal como aparece en la interfaz.
+            str: Nombre del mes tal como aparece en la interfaz, o None si ningún mes alcanza
+                la similitud mínima.
         """
         sleep(self.time_wait())
         html = self._get_html()
@@ -174,6 +182,8 @@ class DownloadManager():
             similarity_scores.append(round(sim, 3))
         
         # Se selecciona el mes con mayor similitud
+        if not similarity_scores or max(similarity_scores) < min_similarity:
+            return None
         index_max = similarity_scores.index(max(similarity_scores))
         return month_names[index_max]
 
@@ -213,26 +223,18 @@ class DownloadManager():
         
         return 'no_file'
 
-    def _click_element_to_download(self, año, mes):
+    def _classify_month_folders(self):
         """
-        Navega por la estructura de carpetas del portal para identificar y descargar el archivo 
-        correspondiente a la última revisión disponible. Si no se encuentra en las carpetas de revisión, 
-        se intenta en la carpeta mensual.
+        Clasifica las carpetas de la página del mes en carpetas de revisión y carpeta mensual.
         
-        Args:
-            año (str/int): Año correspondiente.
-            mes (str): Mes requerido.
+        Returns:
+            tuple: (nombres de las carpetas de revisión, números de versión de cada revisión,
+                nombre de la carpeta mensual o None si no existe).
         """
         sleep(self.time_wait())
         html = self._get_html()
         soup = BeautifulSoup(html, 'html.parser')
         
-        # Construir la ruta base utilizada para generar los XPath de navegación
-        base_xpath = (
-            'Mercado Mayorista/Liquidaciones del MME/01 Mercado de Corto Plazo/'
-            'Liquidaciones VTEA/{año}/{mes}/'
-        ).format(año=año, mes=mes)
-        
         # Se extraen los nombres de las carpetas desde el contenedor principal
         container = soup.find('div', id="browserDocument")
         uls = container.find_all('ul')
@@ -259,14 +261,34 @@ class DownloadManager():
                 if sim_monthly > 0.90:
                     monthly_folder = folder_name
 
+        return revision_folders, revision_versions, monthly_folder
+
+    def _click_element_to_download(self, año, mes):
+        """
+        Navega por la estructura de carpetas del portal para identificar y descargar el archivo 
+        correspondiente a la última revisión disponible. Si no se encuentra en las carpetas de revisión, 
+        se intenta en la carpeta mensual. La revisión descargada se registra en `self.revision`.
+        
+        Args:
+            año (str/int): Año correspondiente.
+            mes (str): Mes requerido.
+        """
+        revision_folders, revision_versions, monthly_folder = self._classify_month_folders()
+
+        # Construir la ruta base utilizada para generar los XPath de navegación
+        base_xpath = self._month_path(año, mes)
+
         # Se intenta acceder a la carpeta de revisión con la versión más alta
         while revision_versions:
             max_index = revision_versions.index(max(revision_versions))
             selected_revision = revision_folders[max_index]
 
+            selected_version = revision_versions[max_index]
+
             # Se ajusta el nombre de la revisión para el caso específico de agosto 2018
             if año=='2018' and mes == '08_Agosto 2018':
                 selected_revision = 'Revisión 01';
+                selected_version = 1
 
             # Construye el XPath para la carpeta de revisión
             xpath_revision = f'//a[@id="{base_xpath}{selected_revision}/"]'
@@ -287,6 +309,7 @@ class DownloadManager():
                 # Se construye el XPath para el botón de descarga y se hace clic
                 xpath_download = f'//*[@id="{base_xpath}{selected_revision}/{file_name}"]'
                 self._optic_click(xpath_download)
+                self.revision = selected_version
                 break
 
         # Si no se encontró en ninguna carpeta de revisión, se busca en la carpeta mensual
@@ -296,24 +319,48 @@ class DownloadManager():
             file_name = self._identify_filenametodownload_button()
             xpath_download = f'//*[@id="{base_xpath}{monthly_folder}/{file_name}"]'
             self._optic_click(xpath_download)
+            self.revision = 0
 
-    # --------------------- Método Principal --------------------- #
-    def download_excel_file(self, año, mes):
+    def _month_path(self, año, mes):
         """
-        Método principal para la descarga del archivo Excel.
+        Construye la ruta base de la carpeta del mes, utilizada para generar los XPath de navegación.
+        
+        Args:
+            año (str/int): Año correspondiente.
+            mes (str): Nombre del mes tal como aparece en la interfaz.
+            
+        Returns:
+            str: Ruta de la carpeta del mes en el portal.
+        """
+        return (
+            'Mercado Mayorista/Liquidaciones del MME/01 Mercado de Corto Plazo/'
+            'Liquidaciones VTEA/{año}/{mes}/'
+        ).format(año=año, mes=mes)
+
+    def _navigate_to_month(self, año, mes, only_published=False):
+        """
+        Navega desde la página inicial del portal hasta la carpeta del mes requerido.
         
         Realiza la siguiente secuencia:
           1. Navega a la sección "Mercado de Corto Plazo".
           2. Ingresa a "Liquidaciones VTEA".
           3. Selecciona el año y mes requeridos.
-          4. Realiza la navegación dinámica para identificar y descargar el archivo.
-          5. Espera hasta que se detecte el nuevo archivo .xlsx en el directorio de descargas.
-          6. Cierra el navegador.
         
         Args:
-            año (str/int): Año de la descarga.
-            mes (str): Mes de la descarga (en formato numérico, e.g., '01' para enero).
+            año (str/int): Año requerido.
+            mes (str): Mes requerido (en formato numérico, e.g., '01' para enero).
+            only_published (bool): Si es True, se verifica que el año y el mes existan en el
+                portal antes de ingresar, en lugar de seleccionar el mes más parecido.
+            
+        Returns:
+            str: Nombre del mes tal como aparece en la interfaz, o None si el año o el mes no
+                están publicados (solo cuando `only_published` es True).
         """
+        # En una sesión reutilizada se vuelve a la página inicial antes de navegar
+        if self._navigated:
+            self.driver.get(self.url)
+        self._navigated = True
+
         # Clic en "Mercado de Corto Plazo"
         xpath_corto_plazo = (
             '//*[@id="Mercado Mayorista/Liquidaciones del MME/01 Mercado de Corto Plazo/"]'
@@ -332,22 +379,151 @@ class DownloadManager():
             '//a[@id="Mercado Mayorista/Liquidaciones del MME/01 Mercado de Corto Plazo/'
             'Liquidaciones VTEA/{año}/"]'
         ).format(año=año)
+        if only_published:
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, xpath_año))
+                )
+            except TimeoutException:
+                return None
         self._optic_click(xpath_año)
 
         # Selecciona el mes requerido mediante identificación por similitud
-        mes_identificado = self._identify_monthname_button(mes)
-        xpath_mes = (
-            '//a[@id="Mercado Mayorista/Liquidaciones del MME/01 Mercado de Corto Plazo/'
-            'Liquidaciones VTEA/{año}/{mes}/"]'
-        ).format(año=año, mes=mes_identificado)
+        mes_identificado = self._identify_monthname_button(mes, 0.90 if only_published else 0)
+        if mes_identificado is None:
+            return None
+        xpath_mes = f'//a[@id="{self._month_path(año, mes_identificado)}"]'
         self._optic_click(xpath_mes)
+        return mes_identificado
+
+    def set_downloads_path(self, downloads_path):
+        """
+        Cambia el directorio de descarga del navegador ya iniciado.
+        
+        Permite reutilizar una misma sesión de Chrome para descargas en distintas carpetas
+        de staging.
+        
+        Args:
+            downloads_path (str): Nuevo directorio de descarga.
+        """
+        self.downloads_path = os.path.abspath(downloads_path)
+        self.driver.execute_cdp_cmd('Page.setDownloadBehavior', {
+            'behavior': 'allow',
+            'downloadPath': self.downloads_path,
+        })
+
+    def close(self):
+        """
+        Cierra el navegador y finaliza la sesión de Chrome.
+        """
+        self.driver.quit()
+
+    # --------------------- Consulta de Publicaciones --------------------- #
+    def find_publication(self, año, mes, after_revision=None):
+        """
+        Busca la publicación más reciente del archivo "ResumenCuadros" de un periodo.
+        
+        Solo se recorre el listado del mes y, desde la revisión más alta hacia abajo, las
+        carpetas con una revisión mayor a `after_revision`, por lo que una consulta sin
+        novedades requiere pocas interacciones con el portal. La carpeta mensual se considera
+        como la revisión 0.
+        
+        Args:
+            año (str/int): Año del periodo.
+            mes (str): Mes del periodo (en formato numérico, e.g., '01' para enero).
+            after_revision (int, opcional): Revisión ya conocida; solo se buscan revisiones mayores.
+            
+        Returns:
+            tuple: (revisión, nombre del archivo) de la publicación encontrada, o None si el mes
+                no está publicado o no hay publicaciones nuevas.
+        """
+        mes_identificado = self._navigate_to_month(año, mes, only_published=True)
+        if mes_identificado is None:
+            return None
+
+        revision_folders, revision_versions, monthly_folder = self._classify_month_folders()
+        candidates = list(zip(revision_versions, revision_folders))
+        if monthly_folder is not None:
+            candidates.append((0, monthly_folder))
+
+        base_xpath = self._month_path(año, mes_identificado)
+        for version, folder in sorted(candidates, reverse=True):
+            if after_revision is not None and version <= after_revision:
+                break
+
+            self._optic_click(f'//a[@id="{base_xpath}{folder}/"]')
+            try:
+                file_name = self._identify_filenametodownload_button()
+            except Exception:
+                file_name = 'no_file'
+            if file_name != 'no_file':
+                return (version, file_name)
+
+            # Si no se encontró el archivo, se vuelve a la carpeta del mes
+            self._optic_click(f"//a[text()='{mes_identificado}']")
+
+        return None
+
+    # --------------------- Método Principal --------------------- #
+    def download_excel_file(self, año, mes, close_browser=True):
+        """
+        Método principal para la descarga del archivo Excel.
+        
+        Realiza la siguiente secuencia:
+          1. Navega hasta la carpeta del año y mes requeridos.
+          2. Realiza la navegación dinámica para identificar y descargar el archivo.
+          3. Espera hasta que se detecte el nuevo archivo .xlsx en el directorio de descargas.
+          4. Cierra el navegador (opcional).
+        
+        Args:
+            año (str/int): Año de la descarga.
+            mes (str): Mes de la descarga (en formato numérico, e.g., '01' para enero).
+            close_browser (bool): Si es False, el navegador queda abierto para reutilizar la sesión.
+
+        Returns:
+            int: Número de la revisión descargada (0 si se descargó desde la carpeta mensual).
+        """
+        mes_identificado = self._navigate_to_month(año, mes)
+
+        # Se cuentan los archivos antes de iniciar la descarga para no perder descargas rápidas
+        num_files_before = self._count_xlsx_files()
 
         # Navegación dinámica para la descarga final del archivo
         self._click_element_to_download(año, mes_identificado)
 
         # Espera hasta que se detecte que se descargó un nuevo archivo .xlsx
-        num_files_before = self._count_xlsx_files()
         WebDriverWait(self.driver, 60).until(lambda d: self._count_xlsx_files() > num_files_before)
 
         # Cierra el navegador una vez completada la descarga
-        self.driver.close()
+        if close_browser:
+            self.driver.close()
+
+        return self.revision
+
+
+def download_period(download_dir, year, month, download_manager=None):
+    """
+    Descarga el archivo Excel de un periodo en una carpeta de staging propia y lo archiva.
+
+    Args:
+        download_dir (DownloadDirectoryManager): Gestor del directorio de descargas.
+        year (str): Año del periodo.
+        month (str): Mes del periodo.
+        download_manager (DownloadManager, opcional): Sesión de navegador a reutilizar. Si no
+            se indica, se abre un navegador nuevo que se cierra al terminar la descarga.
+
+    Returns:
+        str: Ruta del archivo en el archivo histórico.
+    """
+    staging_path = download_dir.create_staging(year, month)
+    try:
+        if download_manager is None:
+            revision = DownloadManager(staging_path).download_excel_file(year, month)
+        else:
+            download_manager.set_downloads_path(staging_path)
+            revision = download_manager.download_excel_file(year, month, close_browser=False)
+        return download_dir.archive(staging_path, year, month, revision)
+    except Exception:
+        # Se descarta la descarga incompleta para no dejar archivos huérfanos en staging
+        download_dir.discard_staging(staging_path)
+        raise
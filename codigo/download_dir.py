@@ -0,0 +1,391 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+from get_pathfile import identify_last_xlsx_file
+from periods import format_period
+
+# Nombre de los archivos archivados: '<AAAA-MM>_r<revisión>.xlsx' (revisión 0 = carpeta mensual)
+ARCHIVE_NAME_PATTERN = re.compile(r'^(\d{4}-\d{2})_r(\d+)\.xlsx$')
+
+
+def _env_number(name, convert, default=None):
+    """
+    Lee una variable de entorno numérica de la política de retención.
+
+    Args:
+        name (str): Nombre de la variable de entorno.
+        convert (type): Tipo al que se convierte el valor (`int` o `float`).
+        default (int/float, opcional): Valor usado si la variable no está definida o está vacía.
+
+    Returns:
+        int/float: Valor de la variable, o `default` si no está definida.
+
+    Raises:
+        SystemExit: Si el valor no es un número del tipo indicado o es negativo.
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        number = convert(value)
+    except ValueError:
+        kind = "un número entero" if convert is int else "un número"
+        raise SystemExit(f"La variable {name} debe ser {kind}")
+    if number < 0:
+        raise SystemExit(f"La variable {name} no puede ser negativa")
+    return number
+
+
+class DownloadDirectoryManager:
+    """
+    Clase para gestionar el directorio de descargas del proceso ETL.
+
+    Cada descarga se realiza en una subcarpeta de staging propia de la ejecución y del periodo,
+    de modo que la detección del archivo descargado no depende del número de archivos
+    acumulados. Una vez completada la descarga, el archivo se mueve de forma atómica al
+    archivo histórico con un nombre determinado por (periodo, revisión), y se registra en un
+    índice en memoria que se persiste en disco. Opcionalmente se aplica una política de
+    retención por cantidad de archivos, antigüedad y tamaño total.
+
+    Varios procesos pueden compartir el mismo directorio: la actualización del índice y la
+    retención se realizan bajo un bloqueo de archivo (`archive/index.lock`), y la retención no
+    elimina archivos archivados hace menos de `grace_seconds`, para no borrar un archivo que
+    otro proceso todavía está cargando.
+
+    Estructura del directorio:
+        <root>/staging/<AAAA-MM>_<id>/   Descargas en curso.
+        <root>/archive/<AAAA-MM>_rNN.xlsx Archivos descargados por periodo y revisión.
+        <root>/archive/index.json        Índice de los archivos archivados.
+        <root>/archive/index.lock        Bloqueo para la actualización del índice.
+    """
+
+    def __init__(self, root, max_files=None, max_age_days=None, max_bytes=None, grace_seconds=3600):
+        """
+        Inicializa el directorio de descargas y carga el índice de archivos archivados.
+
+        Args:
+            root (str): Directorio raíz de descargas.
+            max_files (int, opcional): Cantidad máxima de archivos archivados a conservar.
+            max_age_days (float, opcional): Antigüedad máxima (en días) de los archivos archivados.
+            max_bytes (int, opcional): Tamaño total máximo (en bytes) del archivo histórico.
+            grace_seconds (float): Antigüedad mínima (en segundos) de un archivo para que la
+                retención pueda eliminarlo.
+        """
+        # Chrome requiere una ruta absoluta como directorio de descarga
+        self.root = os.path.abspath(root)
+        self.staging_path = os.path.join(self.root, 'staging')
+        self.archive_path = os.path.join(self.root, 'archive')
+        self.index_path = os.path.join(self.archive_path, 'index.json')
+        self.lock_path = os.path.join(self.archive_path, 'index.lock')
+        self.max_files = max_files
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+
+        os.makedirs(self.staging_path, exist_ok=True)
+        os.makedirs(self.archive_path, exist_ok=True)
+        self.index = self._load_index()
+
+    @classmethod
+    def from_env(cls, root=None):
+        """
+        Crea el gestor a partir de las variables de entorno.
+
+        Se usan 'DOWNLOADS_PATH' (si no se indica `root`), 'RETENTION_MAX_FILES',
+        'RETENTION_MAX_AGE_DAYS', 'RETENTION_MAX_BYTES' y 'RETENTION_GRACE_SECONDS'.
+
+        Args:
+            root (str, opcional): Directorio raíz de descargas.
+
+        Returns:
+            DownloadDirectoryManager: Gestor configurado.
+
+        Raises:
+            SystemExit: Si alguna variable de retención no es un número válido o es negativa.
+        """
+        return cls(
+            root or os.getenv('DOWNLOADS_PATH'),
+            max_files=_env_number('RETENTION_MAX_FILES', int),
+            max_age_days=_env_number('RETENTION_MAX_AGE_DAYS', float),
+            max_bytes=_env_number('RETENTION_MAX_BYTES', int),
+            grace_seconds=_env_number('RETENTION_GRACE_SECONDS', float, 3600),
+        )
+
+    # --------------------- Índice --------------------- #
+    @contextmanager
+    def _index_lock(self):
+        """
+        Bloqueo exclusivo entre procesos para leer, modificar y guardar el índice.
+        """
+        with open(self.lock_path, 'a+b') as lock_file:
+            if os.name == 'nt':
+                lock_file.seek(0)
+                # msvcrt.locking reintenta durante unos segundos antes de fallar; se reintenta
+                # hasta obtener el bloqueo
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self):
+        """
+        Carga el índice desde disco. Si no existe o está dañado, se reconstruye a partir de
+        los nombres de los archivos del archivo histórico.
+
+        Returns:
+            dict: Índice {periodo: {revisión: entrada}}.
+        """
+        try:
+            with open(self.index_path, encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return self._rebuild_index()
+
+    def _rebuild_index(self):
+        """
+        Reconstruye el índice recorriendo una única vez el archivo histórico.
+
+        Returns:
+            dict: Índice {periodo: {revisión: entrada}}.
+        """
+        index = {}
+        with os.scandir(self.archive_path) as entries:
+            for entry in entries:
+                match = ARCHIVE_NAME_PATTERN.match(entry.name)
+                if match is None:
+                    continue
+                stat = entry.stat()
+                index.setdefault(match.group(1), {})[str(int(match.group(2)))] = {
+                    'file': entry.name,
+                    'size': stat.st_size,
+                    'archived_at': stat.st_mtime,
+                }
+        return index
+
+    def _save_index(self):
+        """
+        Persiste el índice en disco de forma atómica (archivo temporal y reemplazo).
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=self.archive_path, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(self.index, file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.index_path)
+
+    # --------------------- Staging --------------------- #
+    def create_staging(self, year, month):
+        """
+        Crea una subcarpeta de staging exclusiva para la descarga de un periodo.
+
+        Args:
+            year (str/int): Año del periodo.
+            month (str/int): Mes del periodo.
+
+        Returns:
+            str: Ruta absoluta de la subcarpeta creada.
+        """
+        return tempfile.mkdtemp(prefix=f'{format_period(year, month)}_', dir=self.staging_path)
+
+    def discard_staging(self, staging_path):
+        """
+        Elimina una subcarpeta de staging y su contenido.
+
+        Args:
+            staging_path (str): Ruta de la subcarpeta de staging.
+        """
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+    def purge_stale_staging(self, max_age_hours=24):
+        """
+        Elimina las subcarpetas de staging abandonadas (por ejemplo, por ejecuciones interrumpidas).
+
+        Args:
+            max_age_hours (float): Antigüedad mínima (en horas) para considerar abandonada una carpeta.
+
+        Returns:
+            list: Rutas de las carpetas eliminadas.
+        """
+        limit = time.time() - max_age_hours * 3600
+        removed = []
+        with os.scandir(self.staging_path) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.stat().st_mtime < limit:
+                    self.discard_staging(entry.path)
+                    removed.append(entry.path)
+        return removed
+
+    # --------------------- Archivo histórico --------------------- #
+    def archive(self, staging_path, year, month, revision):
+        """
+        Mueve el archivo descargado en staging al archivo histórico y lo registra en el índice.
+
+        El movimiento se realiza con `os.replace`, que es atómico dentro del mismo sistema de
+        archivos; si ya existía un archivo para el mismo (periodo, revisión), se reemplaza.
+        Después se elimina la carpeta de staging y se aplica la política de retención, que
+        nunca elimina el archivo recién archivado. El registro en el índice y la retención se
+        realizan bajo el bloqueo del índice.
+
+        Args:
+            staging_path (str): Ruta de la subcarpeta de staging con la descarga.
+            year (str/int): Año del periodo.
+            month (str/int): Mes del periodo.
+            revision (int): Número de revisión descargada (0 para la carpeta mensual).
+
+        Returns:
+            str: Ruta del archivo en el archivo histórico.
+        """
+        period = format_period(year, month)
+        source_path = identify_last_xlsx_file(staging_path)
+        file_name = f'{period}_r{int(revision):02d}.xlsx'
+        target_path = os.path.join(self.archive_path, file_name)
+
+        with self._index_lock():
+            os.replace(source_path, target_path)
+
+            # Se relee el índice bajo el bloqueo para incluir las entradas de otros procesos
+            self.index = self._load_index()
+            self.index.setdefault(period, {})[str(int(revision))] = {
+                'file': file_name,
+                'size': os.path.getsize(target_path),
+                'archived_at': time.time(),
+            }
+            self.apply_retention(keep={(period, str(int(revision)))})
+            self._save_index()
+
+        self.discard_staging(staging_path)
+        return target_path
+
+    def lookup(self, year, month, revision=None):
+        """
+        Retorna la ruta del archivo archivado para un periodo sin recorrer el directorio.
+
+        Args:
+            year (str/int): Año del periodo.
+            month (str/int): Mes del periodo.
+            revision (int, opcional): Revisión buscada. Si no se indica, se retorna la más reciente.
+
+        Returns:
+            str: Ruta del archivo archivado, o None si no existe.
+        """
+        revisions = self.index.get(format_period(year, month))
+        if not revisions:
+            return None
+        if revision is None:
+            revision = self.latest_revision(year, month)
+        entry = revisions.get(str(int(revision)))
+        return os.path.join(self.archive_path, entry['file']) if entry else None
+
+    def latest_revision(self, year, month):
+        """
+        Retorna la revisión más reciente archivada para un periodo.
+
+        Args:
+            year (str/int): Año del periodo.
+            month (str/int): Mes del periodo.
+
+        Returns:
+            int: Número de la revisión más reciente, o None si el periodo no tiene archivos.
+        """
+        revisions = self.index.get(format_period(year, month))
+        return max(int(revision) for revision in revisions) if revisions else None
+
+    def prune(self, max_files=None, max_age_days=None, max_bytes=None):
+        """
+        Aplica la política de retención bajo el bloqueo del índice y persiste el resultado.
+
+        Args:
+            max_files (int, opcional): Cantidad máxima de archivos a conservar.
+            max_age_days (float, opcional): Antigüedad máxima (en días) de los archivos.
+            max_bytes (int, opcional): Tamaño total máximo (en bytes) del archivo histórico.
+
+        Returns:
+            list: Rutas de los archivos eliminados.
+        """
+        with self._index_lock():
+            self.index = self._load_index()
+            removed = self.apply_retention(max_files, max_age_days, max_bytes)
+            self._save_index()
+        return removed
+
+    def apply_retention(self, max_files=None, max_age_days=None, max_bytes=None, keep=()):
+        """
+        Elimina los archivos archivados más antiguos que excedan la política de retención.
+
+        Los límites no indicados se toman de los definidos al crear el gestor. Los archivos
+        archivados hace menos de `grace_seconds` y los indicados en `keep` no se eliminan. El
+        índice se actualiza solo en memoria; desde otros procesos debe usarse `prune`, que
+        toma el bloqueo del índice y lo persiste.
+
+        Args:
+            max_files (int, opcional): Cantidad máxima de archivos a conservar.
+            max_age_days (float, opcional): Antigüedad máxima (en días) de los archivos.
+            max_bytes (int, opcional): Tamaño total máximo (en bytes) del archivo histórico.
+            keep (iterable): Entradas (periodo, revisión) que no deben eliminarse.
+
+        Returns:
+            list: Rutas de los archivos eliminados.
+        """
+        max_files = self.max_files if max_files is None else max_files
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        # Entradas ordenadas de la más antigua a la más reciente
+        entries = sorted(
+            (entry['archived_at'], period, revision, entry)
+            for period, revisions in self.index.items()
+            for revision, entry in revisions.items()
+        )
+        total_bytes = sum(entry['size'] for _, _, _, entry in entries)
+        now = time.time()
+        age_limit = now - max_age_days * 86400 if max_age_days is not None else None
+        keep = set(keep)
+
+        removed = []
+        for archived_at, period, revision, entry in entries:
+            # Los archivos protegidos o recientes pueden estar en uso por otro proceso
+            if (period, revision) in keep or archived_at > now - self.grace_seconds:
+                continue
+
+            remaining = len(entries) - len(removed)
+            if not (
+                (max_files is not None and remaining > max_files)
+                or (age_limit is not None and archived_at < age_limit)
+                or (max_bytes is not None and total_bytes > max_bytes)
+            ):
+                break
+
+            path = os.path.join(self.archive_path, entry['file'])
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= entry['size']
+            removed.append(path)
+
+            del self.index[period][revision]
+            if not self.index[period]:
+                del self.index[period]
+
+        return removed
@@ -1,56 +1,43 @@
-from download import DownloadManager
-from extract import DataExtractor
-from transform import DataTransformer
+from download import download_period
+from download_dir import DownloadDirectoryManager
 from load import DataLoader
-from get_pathfile import identify_last_xlsx_file
-import os
-from dotenv import load_dotenv
+from pipeline import process_file
+from periods import iter_periods, format_period
+from work_queue import LeaseHeartbeat
 import time
 
-# Cargar variables de entorno desde el archivo .env
-ENV_FILE_PATH = 'E:/BI_Comercial/ETL_Python/R006_ETL_ValorizacionEnergia/globals.env'
-load_dotenv(ENV_FILE_PATH)
 
-def run_job():
-    
-    # Obtener fecha a recuoerar 
-    start_year = 2018
-    start_month = 1
-    end_year = 2024
-    end_month = 12
-
-    year = start_year
-    month = start_month
-
-    while (year < end_year) or (year == end_year and month <= end_month):
-        print(f"{year}-{month:02d}")
-        # Esperar 3 segundos
-        time.sleep(3)
-        downloads_path_ve = 'E:\BI_Comercial\ETL_Python\R006_ETL_ValorizacionEnergia\Archivos\Descargas'
-        downloads_path = r"{}".format(downloads_path_ve)
-        objdownload = DownloadManager(downloads_path)
-        objextract = DataExtractor()
-        objload = DataLoader()
-        objdownload.download_excel_file(f"{year}", f"{month:02d}")
-
-        # Descarga 
-        # objdownload.download_excel_file(anio, mes)
-        # extraccion de los datos
-        filepath = identify_last_xlsx_file(downloads_path)
-        data = objextract.extract_data_from_sheet(filepath)
-        # transformacion de los datos
-        data = DataTransformer.transform_data(data, f"{year}", f"{month:02d}")
-        # LLevar a una tabla de base de datos   
-        objload.load_data_to_landing(data)
-
-        if month == 12:
-            month = 1
-            year += 1
-        else:
-            month += 1
-    
+def run_job(start_period, end_period, downloads_path=None, pause=3, connection_string=None,
+            chunk_size=None):
+    """
+    Ejecuta el proceso ETL para cada periodo del rango indicado (carga histórica).
+
+    Args:
+        start_period (tuple): Periodo inicial como tupla (año, mes).
+        end_period (tuple): Periodo final como tupla (año, mes), inclusive.
+        downloads_path (str, opcional): Directorio de descargas. Si no se indica, se usa la
+            variable de entorno 'DOWNLOADS_PATH'.
+        pause (int/float): Segundos de espera entre periodos consecutivos.
+        connection_string (str, opcional): Cadena de conexión para la base de datos.
+        chunk_size (int, opcional): Número de filas por bloque. Si se indica, cada hoja se
+            procesa por bloques para acotar la memoria utilizada.
+    """
+    download_dir = DownloadDirectoryManager.from_env(downloads_path)
+    objload = DataLoader(connection_string)
+
+    for year, month in iter_periods(start_period, end_period):
+        print(f"{year}-{month}")
+        # Esperar entre periodos para no saturar el portal
+        time.sleep(pause)
+
+        # Descarga (el navegador se cierra al terminar cada descarga)
+        filepath = download_period(download_dir, year, month)
+
+        # Extracción, transformación y carga del archivo descargado
+        process_file(filepath, year, month, objload, chunk_size)
 
-def run_etl_job():
+
+def run_etl_job(downloads_path=None, connection_string=None, chunk_size=None):
     """
     Ejecuta el proceso ETL completo para la valorización de energía.
     
@@ -59,33 +46,104 @@ def run_etl_job():
       2. Extracción de datos de la hoja de Excel descargada.
       3. Transformación de los datos extraídos (limpieza, renombrado de columnas y adición de campos).
       4. Carga de los datos transformados en la base de datos.
-    """
-    # Obtener la ruta de descargas definida en las variables de entorno
-    downloads_path = os.getenv('DOWNLOADS_PATH')
 
-    # Inicializar los gestores para cada etapa del proceso ETL
-    download_manager = DownloadManager(downloads_path)
-    db_job = DataLoader()
-    data_extractor = DataExtractor()
+    Args:
+        downloads_path (str, opcional): Directorio de descargas. Si no se indica, se usa la
+            variable de entorno 'DOWNLOADS_PATH'.
+        connection_string (str, opcional): Cadena de conexión para la base de datos.
+        chunk_size (int, opcional): Número de filas por bloque. Si se indica, la hoja se
+            procesa por bloques para acotar la memoria utilizada.
+    """
+    # Inicializar los gestores para cada etapa del proceso ETL (la ruta de descargas y la
+    # política de retención se toman de las variables de entorno si no se indican)
+    download_dir = DownloadDirectoryManager.from_env(downloads_path)
+    db_job = DataLoader(connection_string)
 
     # Obtener el periodo a procesar (año y mes) a partir de la base de datos
     year, month = db_job.get_date_to_retrieve()
 
-    # Descargar el archivo Excel correspondiente al periodo indicado
-    download_manager.download_excel_file(year, month)
-
-    # Identificar el archivo .xlsx descargado (el más reciente en el directorio de descargas)
-    file_path = identify_last_xlsx_file(downloads_path)
+    # Descargar el archivo Excel correspondiente al periodo indicado y moverlo al archivo histórico
+    file_path = download_period(download_dir, year, month)
 
-    # Extraer los datos de la hoja de Excel
-    extracted_data = data_extractor.extract_data_from_sheet(file_path)
+    # Extraer, transformar (limpieza y adición de columnas 'Periodo' y 'FechaCreacion') y cargar
+    # los datos en la tabla de destino en la base de datos
+    process_file(file_path, year, month, db_job, chunk_size)
 
-    # Transformar los datos extraídos (limpieza y adición de columnas 'Periodo' y 'FechaCreacion')
-    transformed_data = DataTransformer.transform_data(extracted_data, year, month)
 
-    # Cargar los datos transformados en la tabla de destino en la base de datos
-    db_job.load_data_to_landing(transformed_data)
+def run_worker(queue, worker_id, downloads_path=None, connection_string=None, chunk_size=None,
+               lease_seconds=900, heartbeat_seconds=60, poll_seconds=30, exit_when_empty=True):
+    """
+    Procesa periodos tomados de una cola de trabajo compartida hasta que se vacíe.
+
+    Varios trabajadores, en la misma o en distintas máquinas, pueden ejecutarse en paralelo
+    sobre la misma cola: cada periodo se reclama con un lease que se renueva mientras se
+    descarga, extrae, transforma y carga. Si el trabajador se detiene, el lease vence y el
+    periodo vuelve a la cola. Cada carga reemplaza las filas previas del periodo dentro de una
+    única transacción, por lo que reprocesar un periodo tras una caída no lo duplica; si el
+    trabajador pierde el lease antes de cargar, abandona el periodo sin cargarlo.
+
+    Args:
+        queue (PeriodWorkQueue): Cola de trabajo de periodos.
+        worker_id (str): Identificador único del trabajador.
+        downloads_path (str, opcional): Directorio de descargas. Si no se indica, se usa la
+            variable de entorno 'DOWNLOADS_PATH'.
+        connection_string (str, opcional): Cadena de conexión para la base de datos de destino.
+        chunk_size (int, opcional): Número de filas por bloque para procesar cada hoja.
+        lease_seconds (int/float): Duración del lease de cada periodo.
+        heartbeat_seconds (int/float): Intervalo de renovación del lease.
+        poll_seconds (int/float): Espera entre consultas cuando la cola no tiene periodos disponibles.
+        exit_when_empty (bool): Si es True, el trabajador termina cuando no hay periodos disponibles.
+    """
+    download_dir = DownloadDirectoryManager.from_env(downloads_path)
+    objload = DataLoader(connection_string)
+
+    while True:
+        try:
+            # Los periodos con el lease vencido vuelven a la cola antes de reclamar uno nuevo
+            queue.requeue_expired()
+            period = queue.claim(worker_id, lease_seconds)
+        except Exception as ex:
+            # Un error transitorio de la base de datos no detiene al trabajador
+            print("Se produjo la excepción al consultar la cola:", ex)
+            time.sleep(poll_seconds)
+            continue
+
+        if period is None:
+            if exit_when_empty:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        year, month = period
+        print(f"{worker_id}: {format_period(year, month)}")
+        try:
+            with LeaseHeartbeat(queue, period, worker_id, lease_seconds, heartbeat_seconds) as heartbeat:
+                filepath = download_period(download_dir, year, month)
+
+                # Si otro trabajador ya reclamó el periodo, no se carga para no duplicarlo
+                if heartbeat.lost or not queue.heartbeat(period, worker_id, lease_seconds):
+                    print(f"{worker_id}: se perdió el lease de {format_period(year, month)}, no se carga")
+                    continue
+
+                process_file(filepath, year, month, objload, chunk_size, replace=True)
+        except Exception as ex:
+            print("Se produjo la excepción:", ex)
+            try:
+                queue.fail(period, worker_id, repr(ex))
+            except Exception as fail_ex:
+                # El lease vencerá y el periodo volverá a la cola
+                print("Se produjo la excepción al registrar el fallo:", fail_ex)
+        else:
+            try:
+                completed = queue.complete(period, worker_id)
+            except Exception as complete_ex:
+                # Los datos ya se cargaron; al reprocesar el periodo se reemplazan sin duplicarse
+                print("Se produjo la excepción al completar el periodo:", complete_ex)
+            else:
+                if not completed:
+                    print(f"{worker_id}: el periodo {format_period(year, month)} fue reasignado antes de completarse")
 
 
 if __name__ == '__main__':
-    run_job()
\ No newline at end of file
+    from cli import main
+    main()
@@ -1,4 +1,15 @@
 import pandas as pd
+from openpyxl import load_workbook
+
+# Número de filas por bloque usado por defecto en el modo de extracción por bloques
+DEFAULT_CHUNK_SIZE = 5000
+
+# Cadenas que Pandas interpreta como nulas por defecto al leer un Excel (ver `na_values` en
+# `pandas.read_excel`); el modo por bloques las trata igual para obtener los mismos datos
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
 
 class DataExtractor:
     """
@@ -48,6 +59,26 @@ class DataExtractor:
         start_row = self._get_start_row(data_from_sheet)
         # Se extraen las filas posteriores a la cabecera y las columnas de interés
         return data_from_sheet.iloc[start_row + 1:, 1:11]
+
+    @staticmethod
+    def _convert_cell(value):
+        """
+        Convierte el valor de una celda a cadena, replicando la lectura de Pandas con dtype=str.
+
+        Los valores vacíos y las cadenas de `NA_STRINGS` se interpretan como nulos, y los números
+        flotantes sin parte decimal se convierten a enteros antes de pasarlos a cadena.
+
+        Args:
+            value: Valor crudo de la celda leído con openpyxl.
+
+        Returns:
+            str: Valor de la celda como cadena, o None si la celda está vacía.
+        """
+        if value is None or (isinstance(value, str) and value in NA_STRINGS):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
     
     def extract_data_from_sheet(self, path):
         """
@@ -69,3 +100,53 @@ class DataExtractor:
         # Eliminar filas con menos de 5 valores no nulos y reiniciar el índice
         data = data.dropna(thresh=5, ignore_index=True)
         return data
+
+    def iter_data_chunks(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Extrae los datos de la hoja "CUADRO 4" por bloques de filas.
+
+        A diferencia de `extract_data_from_sheet`, el workbook se lee en modo de solo lectura
+        fila por fila, por lo que la memoria utilizada queda acotada por el tamaño del bloque
+        y no por el tamaño de la hoja. Se aplican las mismas reglas: se omiten las filas hasta
+        la cabecera (inclusive), se toman las columnas 2 a 11 y se descartan las filas con
+        menos de 5 valores no nulos.
+
+        Args:
+            path (str): Ruta del archivo Excel.
+            chunk_size (int): Número máximo de filas por bloque.
+
+        Yields:
+            DataFrame: Bloque de datos procesados y filtrados.
+        """
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook["CUADRO 4"]
+            # Igual que Pandas, se ignoran las dimensiones declaradas en el archivo, que pueden
+            # estar desactualizadas y truncar las filas leídas en modo de solo lectura
+            sheet.reset_dimensions()
+            rows = sheet.iter_rows(values_only=True)
+
+            # Se omiten las filas hasta encontrar la cabecera (más de 9 valores no nulos)
+            for row in rows:
+                if sum(self._convert_cell(value) is not None for value in row) > 9:
+                    break
+            else:
+                # Sin cabecera se asume la primera fila, igual que en `_get_start_row`
+                rows = sheet.iter_rows(min_row=2, values_only=True)
+
+            chunk = []
+            for row in rows:
+                # Se seleccionan las columnas de interés, completando con nulos si la fila es corta
+                values = [self._convert_cell(value) for value in row[1:11]]
+                values += [None] * (10 - len(values))
+                if sum(value is not None for value in values) < 5:
+                    continue
+                chunk.append(values)
+                if len(chunk) >= chunk_size:
+                    yield pd.DataFrame(chunk)
+                    chunk = []
+
+            if chunk:
+                yield pd.DataFrame(chunk)
+        finally:
+            workbook.close()
@@ -1,4 +1,3 @@
-import glob
 import os
 
 def identify_last_xlsx_file(downloads_path):
@@ -11,16 +10,24 @@ def identify_last_xlsx_file(downloads_path):
 
     Returns:
         str: Ruta completa del archivo .xlsx con la fecha de creación más reciente.
-             Si no se encuentra ningún archivo, se producirá un ValueError.
+
+    Raises:
+        FileNotFoundError: Si el directorio no contiene archivos .xlsx.
     """
-    # Construir el patrón de búsqueda usando os.path.join para mayor robustez
-    file_pattern = os.path.join(downloads_path, '*.xlsx')
-    
-    # Obtener la lista de archivos que coinciden con el patrón
-    xlsx_files = glob.glob(file_pattern)
-    
-    # Seleccionar el archivo con la fecha de creación más reciente
-    # os.path.getctime obtiene la fecha de creación de cada archivo
-    latest_file = max(xlsx_files, key=os.path.getctime)
-    
+    latest_file = None
+    latest_ctime = None
+
+    # Se recorre el directorio una sola vez; os.scandir reutiliza la información de cada entrada
+    with os.scandir(downloads_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.xlsx') or not entry.is_file():
+                continue
+            # st_ctime corresponde a la fecha de creación del archivo en Windows
+            ctime = entry.stat().st_ctime
+            if latest_ctime is None or ctime > latest_ctime:
+                latest_file, latest_ctime = entry.path, ctime
+
+    if latest_file is None:
+        raise FileNotFoundError(f"No se encontraron archivos .xlsx en '{downloads_path}'")
+
     return latest_file
@@ -1,11 +1,8 @@
 from db import DatabaseManager
 from dateutil.relativedelta import relativedelta
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, select
 import os
-from dotenv import load_dotenv
-
-# Cargar variables de entorno desde el archivo .env
-env_file_path = 'E:/BI_Comercial/ETL_Python/R006_ETL_ValorizacionEnergia/globals.env'
-load_dotenv(env_file_path)
 
 
 class DataLoader:
@@ -17,29 +14,61 @@ class DataLoader:
     la tabla de destino.
     """
     
-    def __init__(self):
+    def __init__(self, connection_string=None, **engine_options):
         """
         Inicializa la conexión a la base de datos y define nombres de tablas y esquemas.
+
+        Args:
+            connection_string (str, opcional): Cadena de conexión para la base de datos. Si no
+                se indica, se construye a partir de las variables de entorno.
+            **engine_options: Opciones adicionales para el motor de SQLAlchemy.
         """
-        # Obtener credenciales y configuración de conexión desde las variables de entorno
-        driver = os.getenv('SQL_DRIVE')
-        server = os.getenv('SERVER_NAME')
-        database = os.getenv('DB')
-        admin = os.getenv('ADMIN')
-        password = os.getenv('PSWD')
-        
-        # Construir la cadena de conexión para SQL Server usando pyodbc
-        connection_string = f'mssql+pyodbc://{admin}:{password}@{server}/{database}?driver={driver}'
+        if connection_string is None:
+            connection_string = self._connection_string_from_env()
         
         # Definir nombres de tablas y esquemas para las distintas etapas del proceso ETL
         self.staging_table = '[plata].[ValorizacionEnergia]'
         self.landing_table = 'ValorizacionEnergia'
         self.dim_month_table = '[oro].[Periodo]'
         self.generals_table = '[plata].[Generales]'
+
+        # Revisión del archivo cargada para cada periodo; se crea al usarse por primera vez
+        self.revisions_table = Table(
+            'RevisionesCargadas', MetaData(),
+            Column('Periodo', String(7), primary_key=True),
+            Column('Revision', Integer, nullable=False),
+            Column('FechaCarga', DateTime, nullable=False),
+            schema='bronce',
+        )
+        self._revisions_table_ready = False
         
         # Crear una instancia de la clase de acceso a la base de datos
-        self.db = DatabaseManager(connection_string)
+        self.db = DatabaseManager(connection_string, **engine_options)
     
+    @staticmethod
+    def _connection_string_from_env():
+        """
+        Construye la cadena de conexión a partir de las variables de entorno.
+
+        Si está definida la variable 'DB_CONNECTION_STRING' se usa directamente; en caso
+        contrario se arma la cadena de SQL Server con las credenciales individuales.
+
+        Returns:
+            str: Cadena de conexión para SQLAlchemy.
+        """
+        if os.getenv('DB_CONNECTION_STRING'):
+            return os.getenv('DB_CONNECTION_STRING')
+
+        # Obtener credenciales y configuración de conexión desde las variables de entorno
+        driver = os.getenv('SQL_DRIVE')
+        server = os.getenv('SERVER_NAME')
+        database = os.getenv('DB')
+        admin = os.getenv('ADMIN')
+        password = os.getenv('PSWD')
+
+        # Construir la cadena de conexión para SQL Server usando pyodbc
+        return f'mssql+pyodbc://{admin}:{password}@{server}/{database}?driver={driver}'
+
     def get_date_to_retrieve(self):
         """
         Obtiene la fecha a partir de la cual se deben recuperar nuevos datos.
@@ -94,3 +123,76 @@ class DataLoader:
             data (DataFrame): DataFrame con los datos a almacenar en la base de datos.
         """
         self.db.store_data_pandas(data, self.landing_table)
+
+    def load_chunks_to_landing(self, chunks):
+        """
+        Carga por bloques los datos en la tabla de landing dentro de una única transacción.
+
+        Args:
+            chunks (iterable): Bloques (DataFrame) con los datos a almacenar en la base de datos.
+
+        Returns:
+            int: Número total de filas cargadas.
+        """
+        return self.db.store_data_pandas_chunks(chunks, self.landing_table)
+
+    def replace_period_in_landing(self, chunks, periodo, revision=None):
+        """
+        Reemplaza los datos de un periodo en la tabla de landing dentro de una única transacción.
+
+        Se eliminan las filas existentes del periodo y se insertan los bloques indicados, por lo
+        que volver a cargar un periodo (una nueva revisión o un reintento tras una falla) no
+        duplica sus datos. Si se indica `revision`, se registra en la tabla de revisiones
+        cargadas dentro de la misma transacción: la revisión queda registrada si y solo si sus
+        datos se cargaron.
+
+        Args:
+            chunks (iterable): Bloques (DataFrame) con los datos del periodo.
+            periodo (str): Periodo en formato 'AAAA-MM' (valor de la columna 'Periodo').
+            revision (int, opcional): Revisión del archivo cargado.
+
+        Returns:
+            int: Número total de filas cargadas.
+        """
+        before_commit = None
+        if revision is not None:
+            self._ensure_revisions_table()
+
+            def before_commit(connection):
+                table = self.revisions_table
+                connection.execute(delete(table).where(table.c.Periodo == periodo))
+                connection.execute(table.insert().values(
+                    Periodo=periodo,
+                    Revision=int(revision),
+                    FechaCarga=datetime.now(timezone.utc).replace(tzinfo=None),
+                ))
+
+        return self.db.store_data_pandas_chunks(
+            chunks, self.landing_table, 'Periodo', periodo, before_commit
+        )
+
+    def get_loaded_revision(self, periodo):
+        """
+        Obtiene la revisión del archivo cargada para un periodo.
+
+        Args:
+            periodo (str): Periodo en formato 'AAAA-MM'.
+
+        Returns:
+            int: Revisión registrada por `replace_period_in_landing`, o None si el periodo no
+                tiene una revisión registrada.
+        """
+        self._ensure_revisions_table()
+        table = self.revisions_table
+        with self.db.engine.connect() as connection:
+            return connection.execute(
+                select(table.c.Revision).where(table.c.Periodo == periodo)
+            ).scalar()
+
+    def _ensure_revisions_table(self):
+        """
+        Crea la tabla de revisiones cargadas si no existe (una sola vez por instancia).
+        """
+        if not self._revisions_table_ready:
+            self.revisions_table.create(self.db.engine, checkfirst=True)
+            self._revisions_table_ready = True
@@ -0,0 +1,76 @@
+import re
+
+# Formato de periodo aceptado por la línea de comandos y la cola de trabajo: 'AAAA-MM'
+PERIOD_PATTERN = re.compile(r'^(\d{4})-(\d{2})$')
+
+
+def parse_period(value):
+    """
+    Convierte una cadena con formato 'AAAA-MM' en una tupla (año, mes).
+
+    Args:
+        value (str): Periodo en formato 'AAAA-MM' (ejemplo: '2024-01').
+
+    Returns:
+        tuple: Una tupla (año, mes) de cadenas, con el mes en dos dígitos.
+
+    Raises:
+        ValueError: Si la cadena no tiene el formato esperado o el mes no es válido.
+    """
+    match = PERIOD_PATTERN.match(value.strip())
+    if match is None or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Periodo inválido '{value}', se espera el formato AAAA-MM")
+    return (match.group(1), match.group(2))
+
+
+def format_period(year, month):
+    """
+    Construye la cadena 'AAAA-MM' a partir del año y el mes.
+
+    Args:
+        year (str/int): Año del periodo.
+        month (str/int): Mes del periodo.
+
+    Returns:
+        str: Periodo en formato 'AAAA-MM'.
+    """
+    return f'{int(year):04d}-{int(month):02d}'
+
+
+def iter_periods(start, end):
+    """
+    Genera los periodos comprendidos entre dos periodos, ambos inclusive.
+
+    Args:
+        start (tuple): Periodo inicial como tupla (año, mes).
+        end (tuple): Periodo final como tupla (año, mes).
+
+    Yields:
+        tuple: Una tupla (año, mes) de cadenas para cada periodo del rango.
+    """
+    year, month = int(start[0]), int(start[1])
+    end_year, end_month = int(end[0]), int(end[1])
+
+    while (year < end_year) or (year == end_year and month <= end_month):
+        yield (f'{year}', f'{month:02d}')
+
+        if month == 12:
+            month = 1
+            year += 1
+        else:
+            month += 1
+
+
+def shift_period(period, months):
+    """
+    Desplaza un periodo la cantidad de meses indicada (hacia atrás si es negativa).
+
+    Args:
+        period (tuple): Periodo como tupla (año, mes).
+        months (int): Cantidad de meses a desplazar.
+
+    Returns:
+        tuple: El periodo resultante como tupla (año, mes) de cadenas.
+    """
+    index = int(period[0]) * 12 + int(period[1]) - 1 + months
+    return (f'{index // 12}', f'{index % 12 + 1:02d}')
@@ -0,0 +1,48 @@
+from extract import DataExtractor
+from periods import format_period
+from transform import DataTransformer
+
+
+def process_file(file_path, year, month, loader, chunk_size=None, replace=False, revision=None):
+    """
+    Extrae, transforma y carga en la base de datos un archivo Excel ya descargado.
+
+    Si se indica `chunk_size`, la hoja se procesa por bloques: la extracción genera bloques
+    de filas, cada bloque se transforma por separado y el cargador los inserta dentro de una
+    única transacción. Así, la memoria utilizada queda acotada por el tamaño del bloque. En
+    caso contrario, la hoja completa se carga como un único DataFrame.
+
+    Con `replace=True`, las filas existentes del periodo se eliminan en la misma transacción
+    en que se insertan las nuevas, de modo que volver a procesar un periodo no lo duplica. Si
+    además se indica `revision`, en esa misma transacción se registra la revisión como la
+    cargada para el periodo (ver `DataLoader.get_loaded_revision`).
+
+    Args:
+        file_path (str): Ruta del archivo Excel.
+        year (str): Año correspondiente al periodo.
+        month (str): Mes correspondiente al periodo.
+        loader (DataLoader): Cargador con la conexión a la base de datos.
+        chunk_size (int, opcional): Número de filas por bloque para el modo por bloques.
+        replace (bool): Si es True, reemplaza los datos previos del periodo.
+        revision (int, opcional): Revisión del archivo a registrar como cargada (solo con `replace`).
+
+    Returns:
+        int: Número de filas cargadas.
+    """
+    extractor = DataExtractor()
+
+    if chunk_size:
+        chunks = DataTransformer.transform_chunks(
+            extractor.iter_data_chunks(file_path, chunk_size), year, month
+        )
+    else:
+        data = extractor.extract_data_from_sheet(file_path)
+        data = DataTransformer.transform_data(data, year, month)
+        if not replace:
+            loader.load_data_to_landing(data)
+            return len(data)
+        chunks = [data]
+
+    if replace:
+        return loader.replace_period_in_landing(chunks, format_period(year, month), revision)
+    return loader.load_chunks_to_landing(chunks)
@@ -9,7 +9,7 @@ class DataTransformer:
     """
 
     @classmethod
-    def transform_data(cls, data, year, mes):
+    def transform_data(cls, data, year, mes, fecha_creacion=None):
         """
         Transforma el DataFrame aplicando las siguientes operaciones:
           - Elimina espacios en blanco de cada valor de tipo cadena.
@@ -21,6 +21,8 @@ class DataTransformer:
             data (DataFrame): DataFrame extraído del workbook.
             año (str/int): Año correspondiente al periodo.
             mes (str/int): Mes correspondiente al periodo.
+            fecha_creacion (str, opcional): Valor de la columna 'FechaCreacion'. Si no se indica,
+                se usa la fecha y hora actual.
 
         Returns:
             DataFrame: DataFrame transformado con columnas renombradas y columnas adicionales.
@@ -46,6 +48,26 @@ class DataTransformer:
         data['Periodo'] = f'{year}-{mes}'
 
         # Agregar la columna 'FechaCreacion' con la fecha y hora actual
-        data['FechaCreacion'] = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        data['FechaCreacion'] = fecha_creacion or datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
 
         return data
+
+    @classmethod
+    def transform_chunks(cls, chunks, year, mes):
+        """
+        Transforma de forma perezosa una secuencia de bloques de datos.
+
+        Cada bloque se transforma con `transform_data` a medida que se consume, usando una
+        única 'FechaCreacion' para todos los bloques de la misma carga.
+
+        Args:
+            chunks (iterable): Bloques (DataFrame) extraídos del workbook.
+            year (str/int): Año correspondiente al periodo.
+            mes (str/int): Mes correspondiente al periodo.
+
+        Yields:
+            DataFrame: Bloque transformado.
+        """
+        fecha_creacion = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        for chunk in chunks:
+            yield cls.transform_data(chunk, year, mes, fecha_creacion)
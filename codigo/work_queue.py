@@ -0,0 +1,361 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, and_, create_engine, func, or_, select, update
+)
+from sqlalchemy.exc import IntegrityError
+
+from periods import format_period, parse_period
+
+# Estados posibles de un periodo en la cola
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _utcnow():
+    """
+    Retorna la fecha y hora actual en UTC sin zona horaria (formato almacenado en la tabla).
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _db_utcnow(connection):
+    """
+    Retorna la fecha y hora actual en UTC según el reloj del servidor de base de datos.
+
+    Todos los trabajadores comparan y calculan los vencimientos de los leases con este mismo
+    reloj, por lo que la diferencia entre los relojes locales de las máquinas no afecta a la cola.
+
+    Args:
+        connection (Connection): Conexión abierta a la base de datos de la cola.
+
+    Returns:
+        datetime: Fecha y hora en UTC sin zona horaria.
+    """
+    # CURRENT_TIMESTAMP es la hora local del servidor en SQL Server; en SQLite ya está en UTC
+    if connection.dialect.name == 'mssql':
+        now = func.sysutcdatetime()
+    else:
+        now = func.current_timestamp()
+    value = connection.execute(select(now)).scalar()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class PeriodWorkQueue:
+    """
+    Cola de trabajo persistente de periodos, compartida por varios procesos o máquinas.
+
+    Los periodos se almacenan en una tabla de base de datos. Un trabajador reclama un periodo
+    pendiente y obtiene un lease (préstamo con vencimiento) que debe renovar periódicamente
+    mediante `heartbeat`; al terminar lo marca como completado o fallido. Si un trabajador se
+    detiene sin completar el periodo, su lease vence y el periodo vuelve a quedar disponible
+    para otro trabajador, hasta un máximo de intentos.
+
+    El reclamo se implementa con una actualización condicional (solo tiene efecto si el periodo
+    sigue disponible), por lo que funciona igual en SQL Server y en SQLite sin bloqueos
+    explícitos. Los vencimientos de los leases se calculan con el reloj de la base de datos,
+    no con el de cada trabajador. La entrega es "al menos una vez": si un trabajador carga los datos y se detiene
+    antes de completar el periodo, otro trabajador puede volver a procesarlo; por eso los
+    trabajadores cargan cada periodo reemplazando sus filas previas (ver `run_worker`).
+    """
+
+    def __init__(self, engine, table_name='ColaPeriodos', schema=None, max_attempts=3):
+        """
+        Inicializa la cola sobre el motor de base de datos indicado y crea la tabla si no existe.
+
+        Args:
+            engine (Engine): Motor de SQLAlchemy (por ejemplo, `DatabaseManager.engine`).
+            table_name (str): Nombre de la tabla de la cola.
+            schema (str, opcional): Esquema de la tabla.
+            max_attempts (int): Número máximo de intentos por periodo antes de marcarlo como fallido.
+        """
+        self.engine = engine
+        self.max_attempts = max_attempts
+        self.table = Table(
+            table_name, MetaData(),
+            Column('Periodo', String(7), primary_key=True),
+            Column('Estado', String(10), nullable=False, default=PENDING),
+            Column('Trabajador', String(100)),
+            Column('VenceLease', DateTime),
+            Column('Intentos', Integer, nullable=False, default=0),
+            Column('UltimoError', String(1000)),
+            Column('FechaActualizacion', DateTime, nullable=False, default=_utcnow),
+            schema=schema,
+        )
+        self.table.create(self.engine, checkfirst=True)
+
+    @classmethod
+    def sqlite(cls, path, **kwargs):
+        """
+        Crea una cola sobre un archivo SQLite local (útil para pruebas y ejecuciones en un nodo).
+
+        Args:
+            path (str): Ruta del archivo SQLite.
+            **kwargs: Argumentos adicionales para el constructor.
+
+        Returns:
+            PeriodWorkQueue: Cola creada.
+        """
+        return cls(create_engine(f'sqlite:///{path}'), **kwargs)
+
+    def _claimable(self, now):
+        """
+        Condición de los periodos que pueden reclamarse: pendientes, o en ejecución con el
+        lease vencido y sin superar el máximo de intentos.
+        """
+        t = self.table.c
+        return and_(
+            t.Intentos < self.max_attempts,
+            or_(
+                t.Estado == PENDING,
+                and_(t.Estado == RUNNING, t.VenceLease < now),
+            ),
+        )
+
+    # --------------------- Administración --------------------- #
+    def enqueue(self, periods):
+        """
+        Agrega periodos a la cola. Los periodos ya registrados no se modifican.
+
+        Args:
+            periods (iterable): Periodos como tuplas (año, mes).
+
+        Returns:
+            int: Número de periodos agregados.
+        """
+        added = 0
+        for year, month in periods:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        self.table.insert().values(Periodo=format_period(year, month))
+                    )
+                added += 1
+            except IntegrityError:
+                continue  # El periodo ya existe en la cola
+        return added
+
+    def requeue_expired(self):
+        """
+        Devuelve a pendiente los periodos cuyo lease venció; los que agotaron sus intentos se
+        marcan como fallidos.
+
+        Returns:
+            int: Número de periodos devueltos a pendiente.
+        """
+        t = self.table.c
+        with self.engine.begin() as connection:
+            now = _db_utcnow(connection)
+            expired = and_(t.Estado == RUNNING, t.VenceLease < now)
+            connection.execute(
+                update(self.table)
+                .where(and_(expired, t.Intentos >= self.max_attempts))
+                .values(Estado=FAILED, Trabajador=None, VenceLease=None, FechaActualizacion=now)
+            )
+            result = connection.execute(
+                update(self.table)
+                .where(expired)
+                .values(Estado=PENDING, Trabajador=None, VenceLease=None, FechaActualizacion=now)
+            )
+        return result.rowcount
+
+    def status_counts(self):
+        """
+        Retorna la cantidad de periodos en cada estado.
+
+        Returns:
+            dict: Diccionario {estado: cantidad}.
+        """
+        t = self.table.c
+        with self.engine.connect() as connection:
+            rows = connection.execute(select(t.Estado, func.count()).group_by(t.Estado))
+            return {estado: cantidad for estado, cantidad in rows}
+
+    # --------------------- Operaciones del trabajador --------------------- #
+    def claim(self, worker_id, lease_seconds):
+        """
+        Reclama el periodo disponible más antiguo para el trabajador indicado.
+
+        Args:
+            worker_id (str): Identificador del trabajador.
+            lease_seconds (int/float): Duración del lease en segundos.
+
+        Returns:
+            tuple: El periodo reclamado como tupla (año, mes), o None si no hay periodos disponibles.
+        """
+        t = self.table.c
+        while True:
+            with self.engine.begin() as connection:
+                now = _db_utcnow(connection)
+                period = connection.execute(
+                    select(t.Periodo).where(self._claimable(now)).order_by(t.Periodo).limit(1)
+                ).scalar()
+                if period is None:
+                    return None
+
+                # La actualización solo tiene efecto si ningún otro trabajador lo reclamó antes
+                result = connection.execute(
+                    update(self.table)
+                    .where(and_(t.Periodo == period, self._claimable(now)))
+                    .values(
+                        Estado=RUNNING,
+                        Trabajador=worker_id,
+                        VenceLease=now + timedelta(seconds=lease_seconds),
+                        Intentos=t.Intentos + 1,
+                        FechaActualizacion=now,
+                    )
+                )
+            if result.rowcount == 1:
+                return parse_period(period)
+
+    def heartbeat(self, period, worker_id, lease_seconds):
+        """
+        Renueva el lease de un periodo reclamado por el trabajador.
+
+        Args:
+            period (tuple): Periodo como tupla (año, mes).
+            worker_id (str): Identificador del trabajador.
+            lease_seconds (int/float): Nueva duración del lease en segundos, contada desde ahora.
+
+        Returns:
+            bool: True si el lease se renovó; False si el trabajador ya no tiene el periodo.
+        """
+        return self._update_owned(period, worker_id, lease_seconds=lease_seconds)
+
+    def complete(self, period, worker_id):
+        """
+        Marca como completado un periodo reclamado por el trabajador.
+
+        Args:
+            period (tuple): Periodo como tupla (año, mes).
+            worker_id (str): Identificador del trabajador.
+
+        Returns:
+            bool: True si se marcó; False si el trabajador ya no tenía el periodo.
+        """
+        return self._update_owned(
+            period, worker_id, Estado=DONE, VenceLease=None, UltimoError=None
+        )
+
+    def fail(self, period, worker_id, error):
+        """
+        Registra el fallo de un periodo. Vuelve a quedar pendiente si no agotó sus intentos;
+        en caso contrario se marca como fallido.
+
+        Args:
+            period (tuple): Periodo como tupla (año, mes).
+            worker_id (str): Identificador del trabajador.
+            error (str): Descripción del error.
+
+        Returns:
+            bool: True si se registró; False si el trabajador ya no tenía el periodo.
+        """
+        t = self.table.c
+        estado = PENDING
+        with self.engine.connect() as connection:
+            intentos = connection.execute(
+                select(t.Intentos).where(t.Periodo == format_period(*period))
+            ).scalar()
+        if intentos is not None and intentos >= self.max_attempts:
+            estado = FAILED
+        return self._update_owned(
+            period, worker_id,
+            Estado=estado, Trabajador=None, VenceLease=None,
+            UltimoError=str(error)[:1000]
+        )
+
+    def _update_owned(self, period, worker_id, lease_seconds=None, **values):
+        """
+        Actualiza un periodo solo si sigue en ejecución por el trabajador indicado.
+
+        La fecha de actualización y, si se indica `lease_seconds`, el nuevo vencimiento del
+        lease se calculan con el reloj de la base de datos.
+
+        Returns:
+            bool: True si se actualizó el periodo.
+        """
+        t = self.table.c
+        with self.engine.begin() as connection:
+            now = _db_utcnow(connection)
+            values['FechaActualizacion'] = now
+            if lease_seconds is not None:
+                values['VenceLease'] = now + timedelta(seconds=lease_seconds)
+            result = connection.execute(
+                update(self.table)
+                .where(and_(
+                    t.Periodo == format_period(*period),
+                    t.Estado == RUNNING,
+                    t.Trabajador == worker_id,
+                ))
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+
+class LeaseHeartbeat:
+    """
+    Renueva en segundo plano el lease de un periodo mientras se procesa.
+
+    Se usa como administrador de contexto: el hilo de renovación se inicia al entrar y se
+    detiene al salir. Si la renovación falla, `lost` queda en True.
+    """
+
+    def __init__(self, queue, period, worker_id, lease_seconds, interval_seconds):
+        """
+        Args:
+            queue (PeriodWorkQueue): Cola de trabajo.
+            period (tuple): Periodo reclamado como tupla (año, mes).
+            worker_id (str): Identificador del trabajador.
+            lease_seconds (int/float): Duración del lease en segundos.
+            interval_seconds (int/float): Intervalo entre renovaciones en segundos.
+        """
+        self.queue = queue
+        self.period = period
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval_seconds = interval_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        """
+        Renueva el lease cada `interval_seconds` hasta que se detenga el hilo o se pierda el lease.
+
+        Un error al renovar (por ejemplo, una desconexión momentánea) no detiene el hilo: se
+        reintenta en el siguiente intervalo. Si la cola indica que el trabajador ya no tiene el
+        periodo, se marca `lost` y el hilo termina.
+        """
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                renewed = self.queue.heartbeat(self.period, self.worker_id, self.lease_seconds)
+            except Exception as ex:
+                print("Error al renovar el lease:", ex)
+                continue  # Se reintenta en el siguiente intervalo mientras el lease siga vigente
+            if not renewed:
+                self.lost = True
+                print(f"Se perdió el lease del periodo {format_period(*self.period)}")
+                return
+
+    def __enter__(self):
+        """
+        Inicia el hilo de renovación.
+
+        Returns:
+            LeaseHeartbeat: La propia instancia, para consultar `lost` al terminar.
+        """
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """
+        Detiene el hilo de renovación y espera a que termine. No suprime excepciones.
+        """
+        self._stop.set()
+        self._thread.join()
+        return False
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del proceso ETL se importan directamente desde la carpeta 'codigo'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'codigo'))
@@ -0,0 +1,151 @@
+import pytest
+
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('pandas')
+pytest.importorskip('selenium')
+pytest.importorskip('bs4')
+
+import daemon
+from daemon import PublicationDaemon
+
+
+class FakeBrowser:
+    """Sesión de navegador simulada con las revisiones publicadas de cada periodo."""
+
+    def __init__(self, published):
+        self.published = published
+        self.revision = None
+        self.searches = []
+
+    def find_publication(self, year, month, after_revision=None):
+        self.searches.append(((year, month), after_revision))
+        revision = self.published.get((year, month))
+        if revision is None or (after_revision is not None and revision <= after_revision):
+            return None
+        return (revision, 'ResumenCuadros.xlsx')
+
+    def close(self):
+        pass
+
+
+class FakeLoader:
+    """Cargador simulado que registra la revisión cargada de cada periodo."""
+
+    def __init__(self, next_period, loaded_revisions=None):
+        self.next_period = next_period
+        self.loaded_revisions = dict(loaded_revisions or {})
+        self.lookups = []
+
+    def get_date_to_retrieve(self):
+        return self.next_period
+
+    def get_loaded_revision(self, periodo):
+        self.lookups.append(periodo)
+        return self.loaded_revisions.get(periodo)
+
+
+class FakeETL:
+    """Reemplaza la descarga y la carga del daemon, registrando las llamadas."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.loaded = []
+        self.fail_next_load = False
+
+    def download_period(self, download_dir, year, month, download_manager=None):
+        assert download_manager is self.browser
+        download_manager.revision = self.browser.published[(year, month)]
+        return f'{year}-{month}.xlsx'
+
+    def process_file(self, file_path, year, month, loader, chunk_size=None, replace=False, revision=None):
+        if self.fail_next_load:
+            self.fail_next_load = False
+            raise ConnectionError('conexión perdida')
+        # Igual que `replace_period_in_landing`, la revisión se registra junto con los datos
+        loader.loaded_revisions[f'{year}-{month}'] = revision
+        self.loaded.append((year, month, replace, revision))
+        return 10
+
+
+@pytest.fixture
+def etl(monkeypatch):
+    def make(published):
+        etl = FakeETL(FakeBrowser(published))
+        monkeypatch.setattr(daemon, 'download_period', etl.download_period)
+        monkeypatch.setattr(daemon, 'process_file', etl.process_file)
+        return etl
+
+    return make
+
+
+def _daemon(loader, browser):
+    process = PublicationDaemon(download_dir=None, loader=loader, watch_months=2)
+    process.next_period = loader.get_date_to_retrieve()
+    process.browser = browser
+    return process
+
+
+def test_poll_loads_new_period_once(etl):
+    etl = etl({('2024', '03'): 0})
+    loader = FakeLoader(('2024', '03'), {'2024-02': 1})
+    process = _daemon(loader, etl.browser)
+
+    assert process.poll() == 1
+    assert etl.loaded == [('2024', '03', True, 0)]
+    assert process.next_period == ('2024', '04')
+
+    assert process.poll() == 0
+    assert etl.loaded == [('2024', '03', True, 0)]
+
+
+def test_poll_reads_loaded_revision_from_database(etl):
+    etl = etl({('2024', '01'): 2, ('2024', '02'): 1})
+    loader = FakeLoader(('2024', '03'), {'2024-01': 1, '2024-02': 1})
+    process = PublicationDaemon(download_dir=None, loader=loader, watch_months=3)
+    process.next_period = ('2024', '03')
+    process.browser = etl.browser
+
+    assert process.poll() == 1
+    assert etl.loaded == [('2024', '01', True, 2)]
+    assert (('2024', '02'), 1) in etl.browser.searches
+
+    # La revisión leída de la base de datos se conserva entre consultas
+    process.poll()
+    assert sorted(loader.lookups) == ['2024-01', '2024-02', '2024-03']
+
+
+def test_poll_retries_failed_load(etl):
+    etl = etl({('2024', '03'): 1})
+    loader = FakeLoader(('2024', '03'))
+    process = _daemon(loader, etl.browser)
+    etl.fail_next_load = True
+
+    with pytest.raises(ConnectionError):
+        process.poll()
+    assert loader.loaded_revisions.get('2024-03') is None
+
+    assert process.poll() == 1
+    assert etl.loaded == [('2024', '03', True, 1)]
+
+
+def test_poll_after_restart_does_not_reload(etl):
+    etl = etl({('2024', '02'): 1, ('2024', '03'): 0})
+    loader = FakeLoader(('2024', '02'))
+    process = _daemon(loader, etl.browser)
+    assert process.poll() == 1
+    assert process.poll() == 1
+
+    # Un nuevo proceso toma las revisiones cargadas de la base de datos
+    loader.next_period = ('2024', '04')
+    assert _daemon(loader, etl.browser).poll() == 0
+    assert len(etl.loaded) == 2
+
+
+def test_poll_takes_reference_for_loaded_period_without_revision(etl):
+    etl = etl({('2024', '02'): 3})
+    loader = FakeLoader(('2024', '03'))
+    process = _daemon(loader, etl.browser)
+
+    assert process.poll() == 0
+    assert etl.loaded == []
+    assert process.known_revisions['2024-02'] == 3
@@ -0,0 +1,185 @@
+import json
+import os
+import time
+
+import pytest
+
+from download_dir import DownloadDirectoryManager
+
+
+def _download(manager, year, month, content=b'xlsx'):
+    """Simula una descarga en una carpeta de staging del periodo."""
+    staging_path = manager.create_staging(year, month)
+    with open(os.path.join(staging_path, 'ResumenCuadros.xlsx'), 'wb') as file:
+        file.write(content)
+    return staging_path
+
+
+def _archive(manager, year, month, revision, archived_at=None, content=b'xlsx'):
+    """Archiva una descarga simulada, fijando opcionalmente su fecha de archivo."""
+    path = manager.archive(_download(manager, year, month, content), year, month, revision)
+    if archived_at is not None:
+        period = f'{year}-{month}'
+        manager.index[period][str(revision)]['archived_at'] = archived_at
+        os.utime(path, (archived_at, archived_at))
+        manager._save_index()
+    return path
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DownloadDirectoryManager(tmp_path, grace_seconds=0)
+
+
+def test_archive_names_file_by_period_and_revision(manager):
+    staging_path = _download(manager, '2024', '01')
+
+    path = manager.archive(staging_path, '2024', '01', 3)
+
+    assert os.path.basename(path) == '2024-01_r03.xlsx'
+    assert os.path.dirname(path) == manager.archive_path
+    assert not os.path.exists(staging_path)
+    assert manager.lookup('2024', '01') == path
+    assert manager.lookup('2024', '01', 3) == path
+    assert manager.lookup('2024', '01', 1) is None
+    assert manager.latest_revision('2024', '01') == 3
+
+
+def test_archive_replaces_same_revision(manager):
+    _archive(manager, '2024', '01', 0, content=b'primera')
+    path = _archive(manager, '2024', '01', 0, content=b'segunda')
+
+    with open(path, 'rb') as file:
+        assert file.read() == b'segunda'
+    assert os.listdir(manager.archive_path).count('2024-01_r00.xlsx') == 1
+
+
+def test_index_is_rebuilt_from_file_names(tmp_path, manager):
+    _archive(manager, '2024', '01', 0)
+    _archive(manager, '2024', '01', 2)
+    _archive(manager, '2024', '02', 1)
+    open(os.path.join(manager.archive_path, 'otro.xlsx'), 'wb').close()
+    os.remove(manager.index_path)
+
+    rebuilt = DownloadDirectoryManager(tmp_path)
+
+    assert sorted(rebuilt.index) == ['2024-01', '2024-02']
+    assert sorted(rebuilt.index['2024-01']) == ['0', '2']
+    assert rebuilt.latest_revision('2024', '01') == 2
+    assert rebuilt.lookup('2024', '02') == os.path.join(manager.archive_path, '2024-02_r01.xlsx')
+
+
+def test_damaged_index_is_rebuilt(tmp_path, manager):
+    _archive(manager, '2024', '01', 1)
+    with open(manager.index_path, 'w', encoding='utf-8') as file:
+        file.write('{no es json')
+
+    assert DownloadDirectoryManager(tmp_path).latest_revision('2024', '01') == 1
+
+
+def test_apply_retention_removes_oldest_files(manager):
+    now = time.time()
+    oldest = _archive(manager, '2024', '01', 0, archived_at=now - 300)
+    _archive(manager, '2024', '02', 0, archived_at=now - 200)
+    _archive(manager, '2024', '03', 0, archived_at=now - 100)
+
+    removed = manager.apply_retention(max_files=2)
+
+    assert removed == [oldest]
+    assert not os.path.exists(oldest)
+    assert manager.lookup('2024', '01') is None
+    assert sorted(manager.index) == ['2024-02', '2024-03']
+
+
+def test_apply_retention_by_age_and_size(manager):
+    now = time.time()
+    old = _archive(manager, '2024', '01', 0, archived_at=now - 3 * 86400, content=b'12345')
+    middle = _archive(manager, '2024', '02', 0, archived_at=now - 200, content=b'12345')
+    _archive(manager, '2024', '03', 0, archived_at=now - 100, content=b'12345')
+
+    assert manager.apply_retention(max_age_days=1) == [old]
+    assert manager.apply_retention(max_bytes=5) == [middle]
+    assert sorted(manager.index) == ['2024-03']
+
+
+def test_apply_retention_skips_kept_entries(manager):
+    now = time.time()
+    kept = _archive(manager, '2024', '01', 0, archived_at=now - 300)
+    second = _archive(manager, '2024', '02', 0, archived_at=now - 200)
+    _archive(manager, '2024', '03', 0, archived_at=now - 100)
+
+    removed = manager.apply_retention(max_files=2, keep={('2024-01', '0')})
+
+    assert removed == [second]
+    assert os.path.exists(kept)
+
+
+def test_apply_retention_respects_grace_period(manager):
+    manager.grace_seconds = 3600
+    now = time.time()
+    old = _archive(manager, '2024', '01', 0, archived_at=now - 7200)
+    recent = _archive(manager, '2024', '02', 0, archived_at=now - 60)
+
+    assert manager.apply_retention(max_files=0) == [old]
+    assert os.path.exists(recent)
+
+
+def test_archive_never_removes_new_file(tmp_path):
+    manager = DownloadDirectoryManager(tmp_path, max_bytes=5, grace_seconds=0)
+    _archive(manager, '2024', '01', 0, archived_at=time.time() - 100, content=b'123456')
+
+    path = _archive(manager, '2024', '02', 0, content=b'123456')
+
+    assert os.path.exists(path)
+    assert manager.lookup('2024', '01') is None
+
+
+def test_prune_persists_index(tmp_path, manager):
+    now = time.time()
+    old = _archive(manager, '2024', '01', 0, archived_at=now - 200)
+    _archive(manager, '2024', '02', 0, archived_at=now - 100)
+
+    assert manager.prune(max_files=1) == [old]
+    with open(manager.index_path, encoding='utf-8') as file:
+        assert sorted(json.load(file)) == ['2024-02']
+    assert DownloadDirectoryManager(tmp_path).lookup('2024', '01') is None
+
+
+def test_purge_stale_staging(manager):
+    stale = manager.create_staging('2024', '01')
+    fresh = manager.create_staging('2024', '02')
+    old = time.time() - 48 * 3600
+    os.utime(stale, (old, old))
+
+    assert manager.purge_stale_staging(max_age_hours=24) == [stale]
+    assert not os.path.exists(stale)
+    assert os.path.isdir(fresh)
+
+
+def test_from_env_reads_retention_variables(tmp_path, monkeypatch):
+    monkeypatch.setenv('DOWNLOADS_PATH', str(tmp_path))
+    monkeypatch.setenv('RETENTION_MAX_FILES', '10')
+    monkeypatch.setenv('RETENTION_MAX_AGE_DAYS', '1.5')
+    monkeypatch.setenv('RETENTION_MAX_BYTES', '')
+    monkeypatch.delenv('RETENTION_GRACE_SECONDS', raising=False)
+
+    manager = DownloadDirectoryManager.from_env()
+
+    assert manager.root == str(tmp_path)
+    assert manager.max_files == 10
+    assert manager.max_age_days == 1.5
+    assert manager.max_bytes is None
+    assert manager.grace_seconds == 3600
+
+
+@pytest.mark.parametrize('name, value, message', [
+    ('RETENTION_MAX_FILES', 'diez', 'RETENTION_MAX_FILES debe ser un número entero'),
+    ('RETENTION_MAX_BYTES', '1.5', 'RETENTION_MAX_BYTES debe ser un número entero'),
+    ('RETENTION_MAX_AGE_DAYS', 'x', 'RETENTION_MAX_AGE_DAYS debe ser un número'),
+    ('RETENTION_GRACE_SECONDS', '-1', 'RETENTION_GRACE_SECONDS no puede ser negativa'),
+])
+def test_from_env_rejects_invalid_retention_variables(tmp_path, monkeypatch, name, value, message):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(SystemExit, match=message):
+        DownloadDirectoryManager.from_env(tmp_path)
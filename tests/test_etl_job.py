@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('pandas')
+pytest.importorskip('selenium')
+pytest.importorskip('bs4')
+
+import etl_job
+import work_queue
+from work_queue import PeriodWorkQueue
+
+LEASE_SECONDS = 60
+
+
+class Clock:
+    """Reloj controlable que reemplaza al reloj de la base de datos de la cola."""
+
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self, connection):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class FakeETL:
+    """Reemplaza la descarga y la carga de `run_worker`, registrando las llamadas."""
+
+    def __init__(self, on_download=None, on_load=None):
+        self.on_download = on_download
+        self.on_load = on_load
+        self.downloaded = []
+        self.loaded = []
+
+    def download_period(self, download_dir, year, month):
+        self.downloaded.append((year, month))
+        if self.on_download is not None:
+            self.on_download(year, month)
+        return f'{year}-{month}.xlsx'
+
+    def process_file(self, file_path, year, month, loader, chunk_size=None, replace=False):
+        if self.on_load is not None:
+            self.on_load(year, month)
+        self.loaded.append((year, month, replace))
+        return 10
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, '_db_utcnow', clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return PeriodWorkQueue.sqlite(tmp_path / 'cola.db', max_attempts=2)
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """Ejecuta `run_worker` con la descarga y la carga reemplazadas por `etl`."""
+    monkeypatch.setattr(etl_job, 'DataLoader', lambda connection_string=None: object())
+
+    def run(queue, etl, worker_id='a'):
+        monkeypatch.setattr(etl_job, 'download_period', etl.download_period)
+        monkeypatch.setattr(etl_job, 'process_file', etl.process_file)
+        etl_job.run_worker(
+            queue, worker_id, downloads_path=str(tmp_path / 'descargas'),
+            lease_seconds=LEASE_SECONDS, heartbeat_seconds=3600, poll_seconds=0,
+        )
+
+    return run
+
+
+def test_worker_processes_and_completes_all_periods(queue, run):
+    queue.enqueue([('2024', '02'), ('2024', '01')])
+    etl = FakeETL()
+
+    run(queue, etl)
+
+    assert etl.loaded == [('2024', '01', True), ('2024', '02', True)]
+    assert queue.status_counts() == {'done': 2}
+
+
+def test_worker_does_not_load_after_losing_lease(queue, clock, run):
+    queue.enqueue([('2024', '01')])
+
+    def steal_lease(year, month):
+        # La descarga tarda más que el lease y otro trabajador reclama el periodo
+        clock.advance(LEASE_SECONDS + 1)
+        assert queue.claim('b', LEASE_SECONDS) == (year, month)
+
+    etl = FakeETL(on_download=steal_lease)
+
+    run(queue, etl)
+
+    assert etl.downloaded == [('2024', '01')]
+    assert etl.loaded == []
+    assert queue.status_counts() == {'running': 1}
+    assert queue.complete(('2024', '01'), 'b') is True
+
+
+def test_worker_fails_period_on_error(queue, run):
+    queue.enqueue([('2024', '01')])
+
+    def broken_load(year, month):
+        raise ValueError('hoja no encontrada')
+
+    etl = FakeETL(on_load=broken_load)
+
+    run(queue, etl)
+
+    # El periodo se reintenta hasta agotar los intentos y luego queda como fallido
+    assert etl.downloaded == [('2024', '01'), ('2024', '01')]
+    assert queue.status_counts() == {'failed': 1}
+    with queue.engine.connect() as connection:
+        error = connection.execute(queue.table.select()).one().UltimoError
+    assert 'hoja no encontrada' in error
+
+
+def test_worker_tolerates_failing_complete(queue, run, monkeypatch):
+    queue.enqueue([('2024', '01'), ('2024', '02')])
+
+    def broken_complete(period, worker_id):
+        raise ConnectionError('conexión perdida')
+
+    monkeypatch.setattr(queue, 'complete', broken_complete)
+    etl = FakeETL()
+
+    run(queue, etl)
+
+    assert etl.loaded == [('2024', '01', True), ('2024', '02', True)]
+    assert queue.status_counts() == {'running': 2}
@@ -0,0 +1,97 @@
+import re
+import zipfile
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+openpyxl = pytest.importorskip('openpyxl')
+
+from extract import DataExtractor
+from transform import DataTransformer
+
+FECHA_CREACION = '2024-02-01T10:00:00'
+
+
+def _build_workbook(path):
+    """Crea un workbook pequeño con la estructura de la hoja "CUADRO 4"."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'CUADRO 4'
+    sheet.append(['CUADRO N° 4'])
+    sheet.append([None, 'Valorización de transferencias de energía'])
+    sheet.append([None] + [f'Columna {i}' for i in range(1, 11)] + ['Extra'])
+    sheet.append([None, ' EMPRESA A ', 'BARRA 1', 'Libre', 'Bilateral', 'Retiro', 'CLIENTE 1',
+                  1250.5, 300000, 0.0, 12.25])
+    sheet.append([None, 'EMPRESA B', 'BARRA 2', 'NA', 'N/A', 'Entrega', 'NULL', 10, 'nan', None, '-'])
+    sheet.append([None, 'Subtotal', None, None, None, 99])
+    sheet.append([None, 'EMPRESA C', 'BARRA 3', 'Regulado', 'Licitación', 'Retiro', 'CLIENTE 2',
+                  7.0, 1.5, '#N/A', 'None'])
+    sheet.append([])
+    sheet.append([None, 'EMPRESA D', 'BARRA 4', 'Libre', 'Bilateral', 'Retiro', 'CLIENTE 3',
+                  -3.75, 2, 0, 0])
+    workbook.save(path)
+
+
+def _set_stale_dimension(path):
+    """Reemplaza la dimensión declarada de la hoja por una que solo cubre la primera celda."""
+    with zipfile.ZipFile(path) as source:
+        contents = {name: source.read(name) for name in source.namelist()}
+    sheet_name = 'xl/worksheets/sheet1.xml'
+    contents[sheet_name] = re.sub(
+        rb'<dimension ref="[^"]*"\s*/>', b'<dimension ref="A1"/>', contents[sheet_name]
+    )
+    with zipfile.ZipFile(path, 'w') as target:
+        for name, data in contents.items():
+            target.writestr(name, data)
+
+
+def _normalize(data):
+    """Unifica la representación de los nulos (NaN o None) para comparar ambos modos."""
+    data = data.astype(object)
+    return data.where(data.notna(), None).reset_index(drop=True)
+
+
+def _full_sheet(path):
+    data = DataExtractor().extract_data_from_sheet(path)
+    return _normalize(DataTransformer.transform_data(data, '2024', '01', FECHA_CREACION))
+
+
+def _chunked(path, chunk_size):
+    chunks = DataExtractor().iter_data_chunks(path, chunk_size)
+    data = pd.concat(
+        [DataTransformer.transform_data(chunk, '2024', '01', FECHA_CREACION) for chunk in chunks],
+        ignore_index=True,
+    )
+    return _normalize(data)
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = tmp_path / 'ResumenCuadros.xlsx'
+    _build_workbook(path)
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_chunked_extraction_matches_full_sheet(workbook_path, chunk_size):
+    expected = _full_sheet(workbook_path)
+
+    pd.testing.assert_frame_equal(_chunked(workbook_path, chunk_size), expected)
+    assert len(expected) == 4
+
+
+def test_chunked_extraction_maps_na_strings_to_null(workbook_path):
+    data = _chunked(workbook_path, 100)
+    row = data[data['Empresa'] == 'EMPRESA B'].iloc[0]
+
+    assert row['TipoUsuario'] is None
+    assert row['TipoContrato'] is None
+    assert row['ClienteCentralGeneracion'] is None
+    assert row['ValorizacionSoles'] is None
+    assert row['RentaCongestionBilateral'] == '-'
+
+
+def test_chunked_extraction_ignores_stale_dimension(workbook_path):
+    _set_stale_dimension(workbook_path)
+
+    pd.testing.assert_frame_equal(_chunked(workbook_path, 2), _full_sheet(workbook_path))
@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('dateutil')
+
+from sqlalchemy import event, text
+
+from load import DataLoader
+
+
+@pytest.fixture
+def loader(tmp_path):
+    loader = DataLoader(f"sqlite:///{tmp_path / 'destino.db'}")
+
+    # SQLite no tiene esquemas: el esquema 'bronce' se adjunta como una base de datos aparte
+    @event.listens_for(loader.db.engine, 'connect')
+    def attach_bronce(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE '{tmp_path / 'bronce.db'}' AS bronce")
+
+    loader.db.store_data_pandas(_period_data('2024-01', 1), loader.landing_table)
+    return loader
+
+
+def _period_data(periodo, rows):
+    return pd.DataFrame({'Empresa': [f'EMPRESA {i}' for i in range(rows)], 'Periodo': periodo})
+
+
+def _landing_rows(loader, periodo):
+    with loader.db.engine.connect() as connection:
+        return connection.execute(
+            text('SELECT COUNT(*) FROM bronce.ValorizacionEnergia WHERE Periodo = :periodo'),
+            {'periodo': periodo}
+        ).scalar()
+
+
+def test_replace_period_records_loaded_revision(loader):
+    assert loader.get_loaded_revision('2024-01') is None
+
+    assert loader.replace_period_in_landing([_period_data('2024-01', 2)], '2024-01', revision=1) == 2
+    assert loader.get_loaded_revision('2024-01') == 1
+
+    loader.replace_period_in_landing([_period_data('2024-01', 3)], '2024-01', revision=2)
+    assert loader.get_loaded_revision('2024-01') == 2
+    assert _landing_rows(loader, '2024-01') == 3
+
+
+def test_failed_replace_keeps_previous_revision(loader):
+    loader.replace_period_in_landing([_period_data('2024-01', 2)], '2024-01', revision=1)
+
+    def broken_chunks():
+        yield _period_data('2024-01', 5)
+        raise ValueError('hoja dañada')
+
+    with pytest.raises(ValueError):
+        loader.replace_period_in_landing(broken_chunks(), '2024-01', revision=2)
+
+    assert loader.get_loaded_revision('2024-01') == 1
+    assert _landing_rows(loader, '2024-01') == 2
+
+
+def test_replace_without_revision_does_not_record(loader):
+    loader.replace_period_in_landing([_period_data('2024-02', 1)], '2024-02')
+
+    assert loader.get_loaded_revision('2024-02') is None
+    assert _landing_rows(loader, '2024-02') == 1
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+
+from sqlalchemy import select
+
+import work_queue
+from work_queue import PeriodWorkQueue
+
+
+class Clock:
+    """Reloj controlable para simular el vencimiento de los leases."""
+
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self, connection):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, '_db_utcnow', clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return PeriodWorkQueue.sqlite(tmp_path / 'cola.db', max_attempts=2)
+
+
+def test_enqueue_ignores_existing_periods(queue):
+    assert queue.enqueue([('2024', '01'), ('2024', '02')]) == 2
+    assert queue.enqueue([('2024', '01'), ('2024', '03')]) == 1
+    assert queue.status_counts() == {'pending': 3}
+
+
+def test_claim_returns_oldest_period_once(queue):
+    queue.enqueue([('2024', '02'), ('2024', '01')])
+
+    assert queue.claim('a', 60) == ('2024', '01')
+    assert queue.claim('b', 60) == ('2024', '02')
+    assert queue.claim('c', 60) is None
+    assert queue.status_counts() == {'running': 2}
+
+
+def test_heartbeat_and_complete_require_ownership(queue):
+    queue.enqueue([('2024', '01')])
+    period = queue.claim('a', 60)
+
+    assert queue.heartbeat(period, 'b', 60) is False
+    assert queue.complete(period, 'b') is False
+    assert queue.heartbeat(period, 'a', 60) is True
+    assert queue.complete(period, 'a') is True
+    assert queue.status_counts() == {'done': 1}
+    assert queue.heartbeat(period, 'a', 60) is False
+
+
+def test_heartbeat_extends_lease(queue, clock):
+    queue.enqueue([('2024', '01')])
+    period = queue.claim('a', 60)
+
+    clock.advance(50)
+    assert queue.heartbeat(period, 'a', 60)
+    clock.advance(50)
+    assert queue.claim('b', 60) is None
+
+
+def test_expired_lease_is_reclaimed(queue, clock):
+    queue.enqueue([('2024', '01')])
+    period = queue.claim('a', 60)
+
+    clock.advance(61)
+    assert queue.claim('b', 60) == period
+    # El trabajador original ya no puede renovar ni completar el periodo
+    assert queue.heartbeat(period, 'a', 60) is False
+    assert queue.complete(period, 'a') is False
+    assert queue.complete(period, 'b') is True
+
+
+def test_requeue_expired_returns_period_to_pending(queue, clock):
+    queue.enqueue([('2024', '01')])
+    queue.claim('a', 60)
+
+    clock.advance(61)
+    assert queue.requeue_expired() == 1
+    assert queue.status_counts() == {'pending': 1}
+
+
+def test_requeue_expired_fails_period_without_attempts_left(queue, clock):
+    queue.enqueue([('2024', '01')])
+    queue.claim('a', 60)
+    clock.advance(61)
+    queue.claim('b', 60)
+    clock.advance(61)
+
+    assert queue.requeue_expired() == 0
+    assert queue.status_counts() == {'failed': 1}
+    assert queue.claim('c', 60) is None
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.enqueue([('2024', '01')])
+
+    period = queue.claim('a', 60)
+    assert queue.fail(period, 'a', 'error de descarga')
+    assert queue.status_counts() == {'pending': 1}
+
+    period = queue.claim('b', 60)
+    assert queue.fail(period, 'b', 'error de descarga')
+    assert queue.status_counts() == {'failed': 1}
+    assert queue.claim('c', 60) is None
+
+
+def test_leases_use_database_clock(tmp_path):
+    queue = PeriodWorkQueue.sqlite(tmp_path / 'cola.db')
+    queue.enqueue([('2024', '01')])
+    with queue.engine.connect() as connection:
+        before = work_queue._db_utcnow(connection)
+
+    queue.claim('a', 60)
+
+    with queue.engine.connect() as connection:
+        lease = connection.execute(select(queue.table.c.VenceLease)).scalar()
+    assert before + timedelta(seconds=59) <= lease <= before + timedelta(seconds=62)
+
+
+def test_fail_requires_ownership(queue):
+    queue.enqueue([('2024', '01')])
+    period = queue.claim('a', 60)
+
+    assert queue.fail(period, 'b', 'error') is False
+    assert queue.status_counts() == {'running': 1}